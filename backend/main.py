@@ -11,21 +11,24 @@ from typing import List, Optional, Dict, Any
 from pathlib import Path
 import tempfile
 import os
+import hashlib
 
-from fastapi import FastAPI, UploadFile, File, Depends, HTTPException, Query
+from fastapi import FastAPI, UploadFile, File, Depends, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_, delete, func
 from pydantic import BaseModel
 
 from models import Asset
-from database import get_session, init_db
+from database import get_session, init_db, refresh_stats_views, warm_pool
 from parser import parse_excel, normalize_column_name, is_valid_customer_value
 from pptx_parser import parse_pptx
 from nabu_client import get_nabu_client
 from code_sandbox import get_sandbox
 import pandas as pd
 import json
+import orjson
 
 
 # Initialize FastAPI app
@@ -45,6 +48,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses (asset listings repeat every key per row)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 
 # Response Models
 class UploadResponse(BaseModel):
@@ -84,6 +90,7 @@ class SearchResponse(BaseModel):
 async def on_startup():
     """Initialize database on application startup"""
     await init_db()
+    await warm_pool()
     print("✓ Database initialized successfully")
 
 
@@ -297,6 +304,7 @@ async def upload_file(
         
         # Commit transaction
         await session.commit()
+        await refresh_stats_views()
         
         # Log summary
         if rows_merged_from_multiple_files > 0:
@@ -380,6 +388,31 @@ def _extract_customer_from_raw_data(raw_data: Optional[Dict]) -> Optional[str]:
     return None
 
 
+def _etag_json(request: Request, payload: Any) -> Response:
+    """
+    Serialize a JSON payload with an ETag derived from its bytes.
+    
+    Answers 304 Not Modified when the client's If-None-Match already names
+    this body, so unchanged listings cost a header round-trip only.
+    
+    Args:
+        request: Incoming request (for If-None-Match)
+        payload: Dict or pydantic model to return
+        
+    Returns:
+        JSON response with an ETag header, or an empty 304
+    """
+    if isinstance(payload, BaseModel):
+        payload = payload.model_dump()
+    body = orjson.dumps(payload)
+    # Weak validator: the body may be re-encoded (e.g. compressed) in transit
+    etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
 @app.get("/assets/{serial_number}", response_model=AssetResponse)
 async def get_asset_by_serial(serial_number: str, session: AsyncSession = Depends(get_session)):
     """
@@ -474,6 +507,9 @@ async def search_assets(
             # Search in raw_data JSONB by casting to text
             cast(Asset.raw_data, String).ilike(search_pattern)
         )
+    ).order_by(
+        # Promote the exact serial number match so clients need no separate lookup
+        (Asset.serial_number == q).desc()
     ).limit(limit)
     
     result = await session.execute(stmt)
@@ -537,6 +573,7 @@ async def search_assets(
 
 @app.get("/assets", response_model=SearchResponse)
 async def list_assets(
+    request: Request,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(1000, ge=1, le=50000, description="Maximum results to return"),
     source_files: Optional[str] = Query(None, description="Comma-separated list of source filenames to filter"),
@@ -552,7 +589,7 @@ async def list_assets(
         session: Database session
         
     Returns:
-        SearchResponse with assets
+        SearchResponse with assets (304 when If-None-Match matches its ETag)
     """
     stmt = select(Asset)
     
@@ -561,6 +598,8 @@ async def list_assets(
         file_list = [f.strip() for f in source_files.split(',')]
         stmt = stmt.where(Asset.source_filename.in_(file_list))
     
+    # Stable ordering so skip/limit pages don't overlap
+    stmt = stmt.order_by(Asset.ingest_timestamp.desc(), Asset.id.desc())
     stmt = stmt.offset(skip).limit(limit)
     result = await session.execute(stmt)
     assets = result.scalars().all()
@@ -615,19 +654,19 @@ async def list_assets(
             )
         )
     
-    return SearchResponse(
+    return _etag_json(request, SearchResponse(
         total=len(asset_responses),
         assets=asset_responses
-    )
+    ))
 
 
 @app.get("/source-files")
-async def get_source_files(session: AsyncSession = Depends(get_session)):
+async def get_source_files(request: Request, session: AsyncSession = Depends(get_session)):
     """
     Get list of all unique source filenames with asset counts.
     
     Returns:
-        List of source filenames with metadata
+        List of source filenames with metadata (304 when If-None-Match matches its ETag)
     """
     # Get distinct source filenames with counts
     from sqlalchemy import func
@@ -641,7 +680,7 @@ async def get_source_files(session: AsyncSession = Depends(get_session)):
     result = await session.execute(stmt)
     files = result.all()
     
-    return {
+    return _etag_json(request, {
         "source_files": [
             {
                 "filename": row[0],
@@ -650,7 +689,7 @@ async def get_source_files(session: AsyncSession = Depends(get_session)):
             }
             for row in files
         ]
-    }
+    })
 
 
 @app.get("/files")
@@ -708,6 +747,7 @@ async def delete_source_file(
     delete_stmt = delete(Asset).where(Asset.source_filename == filename)
     await session.execute(delete_stmt)
     await session.commit()
+    await refresh_stats_views()
     
     return {
         "success": True,
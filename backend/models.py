@@ -89,3 +89,4 @@ class Asset(SQLModel, table=True):
 # Create additional indexes for performance
 Index('idx_serial_number', Asset.serial_number)
 Index('idx_ingest_timestamp', Asset.ingest_timestamp)
+Index('idx_ingest_timestamp_id', Asset.ingest_timestamp, Asset.id)  # Keyset pagination order
@@ -9,6 +9,7 @@ Now includes Nabu AI-powered column classification and data normalization.
 
 import re
 import os
+from functools import lru_cache
 from typing import List, Dict, Any, Tuple, Optional
 import pandas as pd
 import numpy as np
@@ -26,6 +27,9 @@ AMD_CPU_SERIAL_PATTERN = re.compile(r'^[0-9][A-Z0-9]{11}_\d{3}-\d{12}$')
 # Examples: 9MT8017P50008_100-000001463, 2ABS784R50042_100-000001359, 9AH0242W50010_100-000001
 AMD_CPU_SERIAL_SEARCH_PATTERN = re.compile(r'[0-9][A-Z0-9]{9,}(?:_\d{3}(?:-\d{1,12})?)?')
 
+# Placeholder values that never identify a real asset (compared lowercased)
+_INVALID_SERIALS = frozenset({'nan', 'none', '', 'null', 'nat', 'n/a', 'na', 'tbd', 'tbc'})
+
 def is_valid_amd_cpu_serial(serial: str) -> bool:
     """Validate if a string matches AMD CPU serial number format.
     
@@ -440,6 +444,7 @@ def clean_value(value: Any) -> Any:
     return value
 
 
+@lru_cache(maxsize=2048)
 def normalize_column_name(column_name: str) -> str:
     """
     Normalize column names to handle case sensitivity and extra spaces.
@@ -464,6 +469,7 @@ def normalize_column_name(column_name: str) -> str:
     return normalized
 
 
+@lru_cache(maxsize=2048)
 def extract_customer_from_filename(filename: str) -> Optional[str]:
     """
     Extract customer name from filename.
@@ -888,7 +894,7 @@ def parse_excel(file_path: str, original_filename: str = None) -> List[Dict[str,
                         print(f"  Extracted error from serial column: '{error_text[:50]}...'")
                 
                 # Skip rows with invalid serial numbers
-                if not serial_number or serial_number.lower() in ['nan', 'none', '', 'null', 'nat', 'n/a', 'na', 'tbd', 'tbc']:
+                if not serial_number or serial_number.lower() in _INVALID_SERIALS:
                     continue
                 
                 # CRITICAL: Filter out legend/reference rows (Label KEY, Color KEY, etc.)
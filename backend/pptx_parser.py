@@ -11,23 +11,40 @@ from typing import List, Dict, Any, Optional
 from pathlib import Path
 import io
 import re
+import threading
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
 from pptx import Presentation
 from pptx.enum.shapes import MSO_SHAPE_TYPE
 import pandas as pd
 from PIL import Image
 
-# OCR is optional - only import if available
-try:
-    import easyocr
+# OCR is optional - easyocr (and the torch stack behind it) is only imported
+# the first time a slide actually needs OCR. None means "not checked yet".
+OCR_AVAILABLE = None
+
+
+def _load_easyocr():
+    """Import easyocr on first use, recording whether it is available"""
+    global OCR_AVAILABLE
+    try:
+        import easyocr
+    except ImportError:
+        if OCR_AVAILABLE is None:
+            print("Warning: easyocr not installed. OCR fallback will be disabled.")
+            print("To enable OCR: pip install easyocr")
+        OCR_AVAILABLE = False
+        return None
     OCR_AVAILABLE = True
-except ImportError:
-    OCR_AVAILABLE = False
-    print("Warning: easyocr not installed. OCR fallback will be disabled.")
-    print("To enable OCR: pip install easyocr")
+    return easyocr
 
-from parser import SerialNumberDetector, clean_value, normalize_column_name, extract_customer_from_filename
+from parser import SerialNumberDetector, clean_value, normalize_column_name, extract_customer_from_filename, _INVALID_SERIALS
+
+# Column detection patterns (English and Chinese), compiled once at import
+_ERROR_COL_RE = re.compile(r'error|failure|issue|symptom|problem|fail|type|故障|错误|defect', re.IGNORECASE)
+_STATUS_COL_RE = re.compile(r'status|state|condition|状态', re.IGNORECASE)
+_COMPONENT_COL_RE = re.compile(r'component|part|child|subpart', re.IGNORECASE)
 
 
 class PPTXParser:
@@ -37,6 +54,8 @@ class PPTXParser:
     
     def __init__(self):
         self.ocr_reader = None  # Lazy load OCR reader
+        self._stats_lock = threading.Lock()  # Slides are processed on worker threads
+        self._ocr_lock = threading.Lock()
         self.customer_from_filename = None  # Store customer extracted from filename
         self.stats = {
             'slides_processed': 0,
@@ -78,37 +97,12 @@ class PPTXParser:
         
         all_data = []
         
-        for slide_idx, slide in enumerate(prs.slides, 1):
-            self.stats['slides_processed'] += 1
-            slide_data = []
-            
-            # Phase 1: Try direct table extraction
-            tables_data = self._extract_tables_from_slide(slide, slide_idx)
-            if tables_data:
-                self.stats['tables_extracted'] += len(tables_data)
-                slide_data.extend(tables_data)
-                print(f"  Slide {slide_idx}: Extracted {len(tables_data)} native tables")
-            
-            # Phase 1b: Try text extraction (for bullet points, text boxes)
-            if not slide_data:
-                text_data = self._extract_text_from_slide(slide, slide_idx)
-                if text_data:
-                    self.stats['text_extracted'] += 1
-                    slide_data.extend(text_data)
-                    print(f"  Slide {slide_idx}: Extracted text content")
-            
-            # Phase 2: OCR fallback for image-heavy slides
-            if not slide_data:
-                ocr_data = self._extract_via_ocr(slide, slide_idx)
-                if ocr_data:
-                    self.stats['ocr_used'] += 1
-                    slide_data.extend(ocr_data)
-                    print(f"  Slide {slide_idx}: Used OCR extraction")
-            
-            if not slide_data:
-                print(f"  Slide {slide_idx}: No data extracted (empty or unsupported content)")
-            
-            all_data.extend(slide_data)
+        # Slides share no mutable state, so process them concurrently (results keep slide order)
+        slides = list(prs.slides)
+        if slides:
+            with ThreadPoolExecutor(max_workers=min(8, len(slides))) as executor:
+                for slide_data in executor.map(self._process_one_slide, enumerate(slides, 1)):
+                    all_data.extend(slide_data)
         
         # Convert to standard asset format
         assets = self._convert_to_asset_format(all_data, source_filename, customer_from_filename)
@@ -124,6 +118,45 @@ class PPTXParser:
         
         return assets
     
+    def _process_one_slide(self, indexed_slide) -> List[Any]:
+        """Run the extraction phases for a single (slide_idx, slide) pair"""
+        slide_idx, slide = indexed_slide
+        self._bump('slides_processed')
+        slide_data = []
+        
+        # Phase 1: Try direct table extraction
+        tables_data = self._extract_tables_from_slide(slide, slide_idx)
+        if tables_data:
+            self._bump('tables_extracted', len(tables_data))
+            slide_data.extend(tables_data)
+            print(f"  Slide {slide_idx}: Extracted {len(tables_data)} native tables")
+        
+        # Phase 1b: Try text extraction (for bullet points, text boxes)
+        if not slide_data:
+            text_data = self._extract_text_from_slide(slide, slide_idx)
+            if text_data:
+                self._bump('text_extracted')
+                slide_data.extend(text_data)
+                print(f"  Slide {slide_idx}: Extracted text content")
+        
+        # Phase 2: OCR fallback for image-heavy slides
+        if not slide_data:
+            ocr_data = self._extract_via_ocr(slide, slide_idx)
+            if ocr_data:
+                self._bump('ocr_used')
+                slide_data.extend(ocr_data)
+                print(f"  Slide {slide_idx}: Used OCR extraction")
+        
+        if not slide_data:
+            print(f"  Slide {slide_idx}: No data extracted (empty or unsupported content)")
+        
+        return slide_data
+    
+    def _bump(self, stat: str, amount: int = 1):
+        """Thread-safe increment of a stats counter"""
+        with self._stats_lock:
+            self.stats[stat] += amount
+    
     def _extract_tables_from_slide(self, slide, slide_idx: int) -> List[pd.DataFrame]:
         """Extract native PowerPoint tables from a slide"""
         tables = []
@@ -198,6 +231,9 @@ class PPTXParser:
                 # Parse text into structured data
                 lines = full_text.split('\n')
                 
+                # One alternation scan per line instead of a substring test per serial
+                serials_re = re.compile('|'.join(re.escape(sn) for sn in set(serials)))
+                
                 current_record = {'_source_slide': slide_idx, '_extraction_method': 'text'}
                 for line in lines:
                     line = line.strip()
@@ -213,7 +249,7 @@ class PPTXParser:
                             current_record[key] = value
                     else:
                         # Check if line contains a serial number
-                        if any(sn in line for sn in serials):
+                        if serials_re.search(line):
                             current_record['raw_text'] = line
                 
                 if len(current_record) > 2:  # More than just _source_slide and _extraction_method
@@ -223,7 +259,7 @@ class PPTXParser:
     
     def _extract_via_ocr(self, slide, slide_idx: int) -> List[Dict[str, Any]]:
         """Extract data using OCR (for image-based content)"""
-        if not OCR_AVAILABLE:
+        if OCR_AVAILABLE is False:
             print(f"    Slide {slide_idx}: OCR not available (easyocr not installed)")
             return []
         
@@ -233,10 +269,15 @@ class PPTXParser:
             if image is None:
                 return []
             
-            # Initialize OCR reader if needed (lazy load)
-            if self.ocr_reader is None:
-                print("    Initializing OCR engine (this may take a moment)...")
-                self.ocr_reader = easyocr.Reader(['en'], gpu=False)
+            # Initialize OCR reader if needed (lazy load, once across workers)
+            with self._ocr_lock:
+                if self.ocr_reader is None:
+                    easyocr = _load_easyocr()
+                    if easyocr is None:
+                        print(f"    Slide {slide_idx}: OCR not available (easyocr not installed)")
+                        return []
+                    print("    Initializing OCR engine (this may take a moment)...")
+                    self.ocr_reader = easyocr.Reader(['en'], gpu=False)
             
             # Perform OCR
             results = self.ocr_reader.readtext(image)
@@ -327,67 +368,71 @@ class PPTXParser:
         status_column = None
         component_column = None
         
-        # Error type keywords (English and Chinese)
-        error_keywords = ['error', 'failure', 'issue', 'symptom', 'problem', 'fail', 
-                         'type', 'failure type', '故障', '错误', 'defect']
-        
-        # Status keywords (English and Chinese)
-        status_keywords = ['status', 'state', 'condition', '状态', 'fa status']
-        
-        # Component keywords
-        component_keywords = ['component', 'part', 'child', 'subpart']
-        
         for col in df.columns:
             col_lower = col.lower().strip()
             
             # Detect error column
-            if not error_column and any(kw in col_lower for kw in error_keywords):
+            if not error_column and _ERROR_COL_RE.search(col_lower):
                 error_column = col
             
             # Detect status column
-            if not status_column and any(kw in col_lower for kw in status_keywords):
+            if not status_column and _STATUS_COL_RE.search(col_lower):
                 status_column = col
             
             # Detect component column
-            if not component_column and any(kw in col_lower for kw in component_keywords):
+            if not component_column and _COMPONENT_COL_RE.search(col_lower):
                 component_column = col
+            
+            if error_column and status_column and component_column:
+                break
+        
+        # Positional access: resolve column indices once, then walk plain ndarray rows
+        columns = df.columns.tolist()
+        values = df.to_numpy(dtype=object)
+        serial_idx = columns.index(serial_column)
+        error_idx = columns.index(error_column) if error_column else None
+        status_idx = columns.index(status_column) if status_column else None
+        slide_col_idx = columns.index('_source_slide') if '_source_slide' in columns else None
+        data_cols = [(j, col) for j, col in enumerate(columns) if j != slide_col_idx]
+        
+        # Metadata identical for every row of this table - build it once
+        row_meta = {'_extraction_method': 'native_table'}
+        if customer_from_filename:
+            # Add customer from filename as fallback if no customer column exists
+            has_customer_column = any('customer' in normalize_column_name(col).lower() for col in columns)
+            if not has_customer_column:
+                row_meta['Customer'] = customer_from_filename
         
         # Process each row
-        for idx, row in df.iterrows():
-            serial_number = str(row[serial_column]).strip()
+        for row_vals in values:
+            serial_number = str(row_vals[serial_idx]).strip()
             
             # Skip invalid serial numbers
-            if not serial_number or serial_number.lower() in ['nan', 'none', '', 'null', 'nat', 'n/a', 'na', 'tbd', 'tbc']:
+            if not serial_number or serial_number.lower() in _INVALID_SERIALS:
                 continue
             
             # Build raw_data - preserve ALL columns
             raw_data = {}
-            for col in df.columns:
-                value = clean_value(row[col])
+            for j, col in data_cols:
+                value = clean_value(row_vals[j])
                 if value is not None:
                     raw_data[col] = value
             
             # Add metadata
-            raw_data['_source_slide'] = row.get('_source_slide', 'unknown')
-            raw_data['_extraction_method'] = 'native_table'
-            
-            # Add customer from filename as fallback if no customer column exists
-            if customer_from_filename:
-                has_customer_column = any('customer' in normalize_column_name(col).lower() for col in df.columns)
-                if not has_customer_column:
-                    raw_data['Customer'] = customer_from_filename
+            raw_data['_source_slide'] = row_vals[slide_col_idx] if slide_col_idx is not None else 'unknown'
+            raw_data.update(row_meta)
             
             # Extract error_type with smart handling
             error_type = None
-            if error_column and error_column in row:
-                error_value = clean_value(row[error_column])
+            if error_idx is not None:
+                error_value = clean_value(row_vals[error_idx])
                 if error_value and str(error_value).strip():
                     error_type = str(error_value).strip()
             
             # Extract status with smart handling
             status = None
-            if status_column and status_column in row:
-                status_value = clean_value(row[status_column])
+            if status_idx is not None:
+                status_value = clean_value(row_vals[status_idx])
                 if status_value and str(status_value).strip():
                     status = str(status_value).strip()
             
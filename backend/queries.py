@@ -4,66 +4,196 @@ This module provides reusable database query functions.
 """
 
 from sqlmodel import select, func
+from sqlalchemy import text, tuple_, lambda_stmt
+from sqlalchemy.orm import raiseload
 from models import Asset
-from typing import Optional, List, Dict, Any
-import pandas as pd
+from database import STATS_VIEWS
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator
+from uuid import UUID
+import base64
 from datetime import datetime
 
 
-async def query_assets_from_db(
-    session,
+# Tier result values that count as a failure (compared lowercased)
+_FAIL_VALUES = frozenset({'fail', 'failed', 'f'})
+
+# Page size bounds for query_assets_from_db
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+# Keyset columns selected alongside query_assets_from_db rows but not returned in them
+_POSITION_KEYS = frozenset({'ingest_timestamp', 'id'})
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    """Clamp a requested page size to 1..MAX_LIMIT (DEFAULT_LIMIT when unset)."""
+    return max(1, min(limit or DEFAULT_LIMIT, MAX_LIMIT))
+
+
+def encode_cursor(ingest_timestamp: datetime, asset_id: UUID) -> str:
+    """Encode a keyset position (ingest_timestamp, id) as an opaque cursor."""
+    raw = f"{ingest_timestamp.isoformat()}|{asset_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode a cursor produced by encode_cursor."""
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    timestamp, asset_id = raw.split('|', 1)
+    return datetime.fromisoformat(timestamp), UUID(asset_id)
+
+
+def _apply_filters(
+    stmt,
     customer: Optional[str] = None,
     status: Optional[str] = None,
     error_type: Optional[str] = None,
     location: Optional[str] = None,
     date_from: Optional[str] = None,
-    date_to: Optional[str] = None,
-    limit: int = 100
-) -> List[Asset]:
+    date_to: Optional[str] = None
+):
     """
-    Query assets with multiple filter options.
-    
-    Args:
-        session: Database session
-        customer: Filter by customer name
-        status: Filter by status
-        error_type: Filter by error type
-        location: Filter by location
-        date_from: Filter by date (ISO format)
-        date_to: Filter by date (ISO format)
-        limit: Maximum number of results
+    Add the shared asset filter predicates to a lambda statement.
     
-    Returns:
-        List of Asset objects
+    Filter values are bound as parameters, so SQLAlchemy caches one compiled
+    statement per combination of active filters instead of rebuilding it.
     """
-    query = select(Asset)
-    
     if customer:
-        query = query.where(Asset.data['Customer'].astext.ilike(f"%{customer}%"))
+        customer_pattern = f"%{customer}%"
+        stmt += lambda s: s.where(Asset.raw_data['Customer'].as_string().ilike(customer_pattern))
     
     if status:
-        query = query.where(Asset.data['status'].astext.ilike(f"%{status}%"))
+        status_pattern = f"%{status}%"
+        stmt += lambda s: s.where(Asset.raw_data['status'].as_string().ilike(status_pattern))
     
     if error_type:
-        query = query.where(Asset.data['error_type'].astext.ilike(f"%{error_type}%"))
+        error_type_pattern = f"%{error_type}%"
+        stmt += lambda s: s.where(Asset.raw_data['error_type'].as_string().ilike(error_type_pattern))
     
     if location:
-        query = query.where(Asset.data['Location'].astext.ilike(f"%{location}%"))
+        location_pattern = f"%{location}%"
+        stmt += lambda s: s.where(Asset.raw_data['Location'].as_string().ilike(location_pattern))
     
     if date_from:
-        query = query.where(Asset.data['Mfg Date Code'].astext >= date_from)
+        stmt += lambda s: s.where(Asset.raw_data['Mfg Date Code'].as_string() >= date_from)
     
     if date_to:
-        query = query.where(Asset.data['Mfg Date Code'].astext <= date_to)
+        stmt += lambda s: s.where(Asset.raw_data['Mfg Date Code'].as_string() <= date_to)
     
-    query = query.limit(limit)
-    result = await session.exec(query)
-    return result.all()
+    return stmt
+
+
+async def query_assets_from_db(
+    session,
+    customer: Optional[str] = None,
+    status: Optional[str] = None,
+    error_type: Optional[str] = None,
+    location: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> AsyncIterator[Tuple[Dict[str, Any], Tuple[datetime, UUID]]]:
+    """
+    Query assets with multiple filter options, streaming rows as they arrive.
+    
+    Only the summary fields are projected on the server (JSON keys extracted
+    with ->>), so full rows are never transferred or hydrated into ORM objects.
+    Rows are fetched through a server-side cursor and yielded one at a time,
+    so callers never need the whole result set in memory.
+    Results are keyset-paginated newest first on (ingest_timestamp, id), so
+    later pages cost the same as the first instead of rescanning an OFFSET.
+    
+    Args:
+        session: Database session
+        customer: Filter by customer name
+        status: Filter by status
+        error_type: Filter by error type
+        location: Filter by location
+        date_from: Filter by date (ISO format)
+        date_to: Filter by date (ISO format)
+        limit: Maximum number of results (clamped to 1..MAX_LIMIT)
+        cursor: next_cursor from a previous page, or None for the first page
+    
+    Yields:
+        (row, position) pairs. Rows are compact dicts using the short keys
+        sn (serial_number), c (customer), st (status), et (error_type),
+        lo (location), ft (failtype), d (date), l1, l2, ate, slt, with null
+        fields omitted; position is the row's (ingest_timestamp, id) keyset, which
+        encode_cursor turns into the next page's cursor.
+    """
+    limit = clamp_limit(limit)
+    stmt = lambda_stmt(lambda: select(
+        Asset.ingest_timestamp,
+        Asset.id,
+        Asset.serial_number.label('sn'),
+        Asset.raw_data['Customer'].as_string().label('c'),
+        Asset.raw_data['status'].as_string().label('st'),
+        Asset.raw_data['error_type'].as_string().label('et'),
+        Asset.raw_data['Location'].as_string().label('lo'),
+        Asset.raw_data['Failtype'].as_string().label('ft'),
+        Asset.raw_data['Mfg Date Code'].as_string().label('d'),
+        Asset.raw_data['L1'].as_string().label('l1'),
+        Asset.raw_data['L2'].as_string().label('l2'),
+        Asset.raw_data['ATE'].as_string().label('ate'),
+        Asset.raw_data['SLT'].as_string().label('slt'),
+    ))
+    
+    stmt = _apply_filters(
+        stmt,
+        customer=customer,
+        status=status,
+        error_type=error_type,
+        location=location,
+        date_from=date_from,
+        date_to=date_to
+    )
+    
+    if cursor:
+        cursor_timestamp, cursor_id = decode_cursor(cursor)
+        stmt += lambda s: s.where(
+            tuple_(Asset.ingest_timestamp, Asset.id) < tuple_(cursor_timestamp, cursor_id)
+        )
+    
+    stmt += lambda s: s.order_by(Asset.ingest_timestamp.desc(), Asset.id.desc()).limit(limit)
+    result = await session.stream(stmt)
+    
+    async for row in result.mappings():
+        position = (row['ingest_timestamp'], row['id'])
+        yield {k: v for k, v in row.items() if v is not None and k not in _POSITION_KEYS}, position
+
+
+async def count_assets_filtered(
+    session,
+    customer: Optional[str] = None,
+    status: Optional[str] = None,
+    error_type: Optional[str] = None,
+    location: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None
+) -> int:
+    """Count assets matching the same filters as query_assets_from_db."""
+    query = _apply_filters(
+        lambda_stmt(lambda: select(func.count()).select_from(Asset)),
+        customer=customer,
+        status=status,
+        error_type=error_type,
+        location=location,
+        date_from=date_from,
+        date_to=date_to
+    )
+    result = await session.execute(query)
+    return result.scalar_one()
 
 
 async def get_asset_by_serial(session, serial_number: str) -> Optional[Asset]:
-    """Get a specific asset by serial number."""
-    query = select(Asset).where(Asset.serial_number == serial_number)
+    """
+    Get a specific asset by serial number.
+    
+    raiseload('*') guarantees a single round-trip: any lazy load added to the
+    model later fails loudly instead of silently issuing extra queries.
+    """
+    query = select(Asset).where(Asset.serial_number == serial_number).options(raiseload('*'))
     result = await session.exec(query)
     return result.first()
 
@@ -81,15 +211,21 @@ async def get_database_summary(session) -> Dict[str, Any]:
             "date_range": None
         }
     
-    # Extract data
-    df = pd.DataFrame([asset.data for asset in all_assets])
-    
-    customers = df['Customer'].dropna().unique().tolist() if 'Customer' in df else []
-    error_types = df['error_type'].dropna().unique().tolist() if 'error_type' in df else []
-    
+    # Extract only the three summary keys in a single pass (no DataFrame)
+    customers = set()
+    error_types = set()
     dates = []
-    if 'Mfg Date Code' in df:
-        dates = df['Mfg Date Code'].dropna().tolist()
+    for asset in all_assets:
+        data = asset.raw_data
+        customer = data.get('Customer')
+        if customer is not None:
+            customers.add(customer)
+        error_type = data.get('error_type')
+        if error_type is not None:
+            error_types.add(error_type)
+        date_code = data.get('Mfg Date Code')
+        if date_code is not None:
+            dates.append(date_code)
     
     date_range = None
     if dates:
@@ -103,7 +239,7 @@ async def get_database_summary(session) -> Dict[str, Any]:
         "customers": sorted(customers),
         "error_types": sorted(error_types)[:20],  # Top 20
         "date_range": date_range,
-        "last_updated": max(a.updated_at for a in all_assets).isoformat() if all_assets else None
+        "last_updated": max(a.ingest_timestamp for a in all_assets).isoformat()
     }
 
 
@@ -111,129 +247,124 @@ async def get_statistics(session, grouping: str = "customer") -> Dict[str, Any]:
     """
     Get aggregated statistics grouped by different dimensions.
     
+    Reads the pre-aggregated mv_stats_<grouping> materialized view (one row
+    per group, refreshed on ingest) instead of scanning every asset.
+    
     Args:
         grouping: One of 'customer', 'error', 'status', 'location', 'tier', 'timeline'
     """
-    result = await session.exec(select(Asset))
-    all_assets = result.all()
+    if grouping not in STATS_VIEWS:
+        return {"error": f"Grouping '{grouping}' not supported or no data available"}
     
-    if not all_assets:
+    # Grouping is whitelisted above, so the view name is safe to interpolate
+    order = "k" if grouping == "timeline" else "c DESC"
+    result = await session.execute(text(f"SELECT k, c FROM mv_stats_{grouping} ORDER BY {order}"))
+    rows = result.all()
+    
+    total = sum(c for _, c in rows)
+    if not total:
         return {"error": "No assets found"}
     
-    df = pd.DataFrame([asset.data for asset in all_assets])
+    counts = {k: c for k, c in rows if k is not None}
+    if not counts:
+        return {"error": f"Grouping '{grouping}' not supported or no data available"}
     
     if grouping == "customer":
-        if 'Customer' in df:
-            counts = df['Customer'].value_counts().to_dict()
-            total = sum(counts.values())
-            return {
-                "grouping": "customer",
-                "counts": counts,
-                "percentages": {k: round(v/total*100, 2) for k, v in counts.items()}
-            }
-    
-    elif grouping == "error":
-        if 'error_type' in df:
-            counts = df['error_type'].value_counts().to_dict()
-            return {"grouping": "error_type", "counts": counts}
-    
-    elif grouping == "status":
-        if 'status' in df:
-            counts = df['status'].value_counts().to_dict()
-            return {"grouping": "status", "counts": counts}
-    
-    elif grouping == "location":
-        if 'Location' in df:
-            counts = df['Location'].value_counts().to_dict()
-            return {"grouping": "location", "counts": counts}
-    
-    elif grouping == "tier":
-        # Find first failing tier
-        tier_cols = ['L1', 'L2', 'ATE', 'SLT', 'CESLT', 'OSV']
-        available_tiers = [col for col in tier_cols if col in df]
-        
-        if available_tiers:
-            first_fails = []
-            for _, row in df.iterrows():
-                for tier in available_tiers:
-                    if pd.notna(row.get(tier)) and str(row.get(tier)).lower() in ['fail', 'failed', 'f']:
-                        first_fails.append(tier)
-                        break
-            
-            if first_fails:
-                counts = pd.Series(first_fails).value_counts().to_dict()
-                return {"grouping": "tier", "counts": counts}
-    
-    elif grouping == "timeline":
-        if 'Mfg Date Code' in df:
-            # Group by date
-            counts = df['Mfg Date Code'].value_counts().sort_index().to_dict()
-            return {"grouping": "timeline", "counts": counts}
-    
-    return {"error": f"Grouping '{grouping}' not supported or no data available"}
+        return {
+            "grouping": "customer",
+            "counts": counts,
+            "percentages": {k: round(c / total * 100, 2) for k, c in counts.items()}
+        }
+    
+    return {"grouping": "error_type" if grouping == "error" else grouping, "counts": counts}
 
 
 async def search_assets(session, query: str, limit: int = 50) -> List[Asset]:
     """
     Search assets across multiple fields.
+    
+    Matches the generated search_vector column (full-text, every word must
+    appear in any field) or search_blob (substring), both GIN-indexed, and
+    ranks full-text hits first.
     """
-    # Search in multiple fields using OR logic
     search_query = select(Asset).where(
-        (Asset.serial_number.ilike(f"%{query}%")) |
-        (Asset.data['Customer'].astext.ilike(f"%{query}%")) |
-        (Asset.data['error_type'].astext.ilike(f"%{query}%")) |
-        (Asset.data['Location'].astext.ilike(f"%{query}%")) |
-        (Asset.data['status'].astext.ilike(f"%{query}%"))
+        text(
+            "search_vector @@ plainto_tsquery('simple', :q) OR search_blob LIKE :pattern"
+        ).bindparams(q=query, pattern=f"%{query.lower()}%")
+    ).order_by(
+        text("ts_rank(search_vector, plainto_tsquery('simple', :rank_q)) DESC").bindparams(rank_q=query)
     ).limit(limit)
     
     result = await session.exec(search_query)
     return result.all()
 
 
+async def _customer_totals(session, customer_filter) -> Tuple[int, List[str]]:
+    """Total asset count and serial numbers for a customer in one round-trip."""
+    result = await session.execute(
+        select(func.count(), func.array_agg(Asset.serial_number)).where(customer_filter)
+    )
+    return tuple(result.one())
+
+
+async def _count_by(session, key: str, customer_filter) -> Dict[str, int]:
+    """Count a customer's assets grouped by one JSON key, most frequent first."""
+    column = Asset.raw_data[key].as_string()
+    count = func.count().label('count')
+    query = (
+        select(column, count)
+        .where(customer_filter, column.isnot(None))
+        .group_by(column)
+        .order_by(count.desc())
+    )
+    result = await session.execute(query)
+    return {value: n for value, n in result.all()}
+
+
+async def _customer_tier_failures(session, customer_filter) -> Dict[str, int]:
+    """Failure count per tier column, one FILTER clause per tier in a single scan."""
+    tier_cols = ['L1', 'L2', 'ATE', 'SLT', 'CESLT', 'OSV']
+    result = await session.execute(
+        select(*[
+            func.count().filter(func.lower(Asset.raw_data[tier].as_string()).in_(sorted(_FAIL_VALUES)))
+            for tier in tier_cols
+        ]).where(customer_filter)
+    )
+    return {tier: n for tier, n in zip(tier_cols, result.one()) if n > 0}
+
+
 async def get_customer_insights(session, customer: str) -> Dict[str, Any]:
-    """Get comprehensive insights for a specific customer."""
-    # Get all assets for this customer
-    query = select(Asset).where(Asset.data['Customer'].astext.ilike(f"%{customer}%"))
-    result = await session.exec(query)
-    assets = result.all()
+    """
+    Get comprehensive insights for a specific customer.
     
-    if not assets:
+    All breakdowns are aggregated in Postgres (GROUP BY / FILTER), so only
+    one row per category comes back instead of every matching asset. They
+    run one after another on the caller's session (one pool checkout).
+    """
+    customer_filter = Asset.raw_data['Customer'].as_string().ilike(f"%{customer}%")
+    
+    total, serial_numbers = await _customer_totals(session, customer_filter)
+    if not total:
         return {"error": f"No assets found for customer '{customer}'"}
     
-    df = pd.DataFrame([asset.data for asset in assets])
+    error_types = await _count_by(session, "error_type", customer_filter)
+    statuses = await _count_by(session, "status", customer_filter)
+    locations = await _count_by(session, "Location", customer_filter)
+    tier_failures = await _customer_tier_failures(session, customer_filter)
     
     insights = {
         "customer": customer,
-        "total_assets": len(assets),
-        "serial_numbers": [a.serial_number for a in assets]
+        "total_assets": total,
+        "serial_numbers": serial_numbers
     }
     
-    # Error type breakdown
-    if 'error_type' in df:
-        insights["error_types"] = df['error_type'].value_counts().to_dict()
-    
-    # Status breakdown
-    if 'status' in df:
-        insights["statuses"] = df['status'].value_counts().to_dict()
-    
-    # Location breakdown
-    if 'Location' in df:
-        insights["locations"] = df['Location'].value_counts().to_dict()
+    # Error type / status / location breakdowns
+    for insight_key, counts in (("error_types", error_types), ("statuses", statuses), ("locations", locations)):
+        if counts:
+            insights[insight_key] = counts
     
     # Tier analysis
-    tier_cols = ['L1', 'L2', 'ATE', 'SLT', 'CESLT', 'OSV']
-    available_tiers = [col for col in tier_cols if col in df]
-    
-    if available_tiers:
-        tier_failures = {}
-        for tier in available_tiers:
-            fail_count = df[tier].apply(
-                lambda x: str(x).lower() in ['fail', 'failed', 'f'] if pd.notna(x) else False
-            ).sum()
-            if fail_count > 0:
-                tier_failures[tier] = int(fail_count)
-        
-        if tier_failures:
-            insights["tier_failures"] = tier_failures
+    if tier_failures:
+        insights["tier_failures"] = tier_failures
     
     return insights
@@ -4,24 +4,95 @@ Exposes hardware failure data via Model Context Protocol.
 """
 
 from fastmcp import FastMCP
-from database import get_session
+from database import async_session, warm_pool
 from queries import (
     query_assets_from_db,
+    count_assets_filtered,
+    encode_cursor,
+    decode_cursor,
+    clamp_limit,
     get_asset_by_serial,
     get_database_summary,
     get_statistics,
     search_assets,
     get_customer_insights
 )
-import json
+import anyio
+import orjson
 import os
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from functools import wraps
 from typing import Optional
 
 # Initialize MCP server
 mcp = FastMCP("Silicon Trace")
 
 
+def _dumps(obj) -> str:
+    """Serialize a tool/resource response with orjson (handles datetime natively)."""
+    return orjson.dumps(
+        obj,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    ).decode()
+
+# The database summary scans every asset and only changes when data is ingested,
+# so its serialized result is cached in-process for a short TTL. Statistics are
+# read from the materialized views and are not cached here.
+STATS_CACHE_TTL = int(os.getenv("STATS_CACHE_TTL", "60"))
+STATS_CACHE_SIZE = 32
+
+# One pooled session per tool/resource invocation, shared by everything it calls
+_session_var: ContextVar = ContextVar("session", default=None)
+
+
+def with_session(func):
+    """Open a session for the duration of one MCP invocation (reused if nested)."""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        if _session_var.get() is not None:
+            return await func(*args, **kwargs)
+        async with async_session() as session:
+            token = _session_var.set(session)
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                _session_var.reset(token)
+    return wrapper
+
+
+def current_session():
+    """Session opened by with_session for the current invocation."""
+    return _session_var.get()
+
+
+def async_cached(ttl: int = STATS_CACHE_TTL, maxsize: int = STATS_CACHE_SIZE):
+    """Cache an async handler's result per arguments for ttl seconds (at most maxsize entries)."""
+    def decorator(func):
+        cache = OrderedDict()
+        
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            hit = cache.get(key)
+            if hit and hit[0] > now:
+                return hit[1]
+            value = await func(*args, **kwargs)
+            # Evict expired entries, then the oldest beyond maxsize
+            for stale in [k for k, (expires, _) in cache.items() if expires <= now]:
+                del cache[stale]
+            cache[key] = (now + ttl, value)
+            while len(cache) > maxsize:
+                cache.popitem(last=False)
+            return value
+        return wrapper
+    return decorator
+
+
 @mcp.tool()
+@with_session
 async def query_assets(
     customer: Optional[str] = None,
     status: Optional[str] = None,
@@ -29,10 +100,12 @@ async def query_assets(
     location: Optional[str] = None,
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
-    limit: int = 100
+    limit: int = 100,
+    cursor: Optional[str] = None
 ) -> str:
     """
     Query hardware failure assets with multiple filter options.
+    Results are newest first; pass the returned next_cursor to get the next page.
     
     Args:
         customer: Filter by customer name (e.g., 'ALIBABA', 'TENCENT')
@@ -42,55 +115,56 @@ async def query_assets(
         date_from: Filter from date (ISO format: YYYY-MM-DD)
         date_to: Filter to date (ISO format: YYYY-MM-DD)
         limit: Maximum number of results (default 100, max 1000)
+        cursor: next_cursor from a previous call to continue paging
     
     Returns:
-        JSON string with array of matching assets
+        JSON string with array of matching assets and next_cursor (null on the last page).
+        Assets use short keys and omit empty fields:
+        sn=serial_number, c=customer, st=status, et=error_type, lo=location,
+        ft=failtype, d=date (Mfg Date Code), l1/l2/ate/slt=tier results
     
     Examples:
         query_assets(customer="ALIBABA", limit=50)
         query_assets(status="failed", error_type="L1")
         query_assets(date_from="2025-01-01", date_to="2025-12-31")
     """
-    if limit > 1000:
-        limit = 1000
+    limit = clamp_limit(limit)  # Same bound query_assets_from_db applies
     
-    async with get_session() as session:
-        assets = await query_assets_from_db(
-            session,
-            customer=customer,
-            status=status,
-            error_type=error_type,
-            location=location,
-            date_from=date_from,
-            date_to=date_to,
-            limit=limit
-        )
-        
-        # Format response
-        result = []
-        for asset in assets:
-            result.append({
-                "serial_number": asset.serial_number,
-                "customer": asset.data.get("Customer"),
-                "status": asset.data.get("status"),
-                "error_type": asset.data.get("error_type"),
-                "location": asset.data.get("Location"),
-                "failtype": asset.data.get("Failtype"),
-                "date": asset.data.get("Mfg Date Code"),
-                "l1": asset.data.get("L1"),
-                "l2": asset.data.get("L2"),
-                "ate": asset.data.get("ATE"),
-                "slt": asset.data.get("SLT")
-            })
-        
-        return json.dumps({
-            "count": len(result),
-            "limit": limit,
-            "assets": result
-        }, indent=2)
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError:  # Malformed base64 / text / timestamp / UUID
+            return _dumps({"error": "invalid cursor"})
+    
+    session = current_session()
+    # Rows arrive already projected to the response shape
+    result = []
+    last_position = None
+    async for row, position in query_assets_from_db(
+        session,
+        customer=customer,
+        status=status,
+        error_type=error_type,
+        location=location,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit,
+        cursor=cursor
+    ):
+        result.append(row)
+        last_position = position
+    
+    next_cursor = encode_cursor(*last_position) if result and len(result) == limit else None
+    return _dumps({
+        "count": len(result),
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "assets": result
+    })
 
 
 @mcp.tool()
+@with_session
 async def get_asset_details(serial_number: str) -> str:
     """
     Get complete details for a specific serial number.
@@ -105,25 +179,26 @@ async def get_asset_details(serial_number: str) -> str:
     Example:
         get_asset_details("9AMA377P50091_100-000001359")
     """
-    async with get_session() as session:
-        asset = await get_asset_by_serial(session, serial_number)
-        
-        if not asset:
-            return json.dumps({
-                "error": f"Asset not found: {serial_number}"
-            })
-        
-        return json.dumps({
-            "serial_number": asset.serial_number,
-            "data": asset.data,
-            "source_file": asset.source_file,
-            "source_sheet": asset.source_sheet,
-            "created_at": asset.created_at.isoformat(),
-            "updated_at": asset.updated_at.isoformat()
-        }, indent=2)
+    session = current_session()
+    asset = await get_asset_by_serial(session, serial_number)
+    
+    if not asset:
+        return _dumps({
+            "error": f"Asset not found: {serial_number}"
+        })
+    
+    return _dumps({
+        "serial_number": asset.serial_number,
+        "error_type": asset.error_type,
+        "status": asset.status,
+        "data": asset.raw_data,
+        "source_file": asset.source_filename,
+        "ingest_timestamp": asset.ingest_timestamp
+    })
 
 
 @mcp.tool()
+@with_session
 async def get_stats(grouping: str = "customer") -> str:
     """
     Get aggregated statistics grouped by different dimensions.
@@ -144,12 +219,13 @@ async def get_stats(grouping: str = "customer") -> str:
         get_stats(grouping="customer")
         get_stats(grouping="tier")
     """
-    async with get_session() as session:
-        stats = await get_statistics(session, grouping)
-        return json.dumps(stats, indent=2)
+    session = current_session()
+    stats = await get_statistics(session, grouping)
+    return _dumps(stats)
 
 
 @mcp.tool()
+@with_session
 async def search_failures(query: str, limit: int = 50) -> str:
     """
     Search across all fields using natural language query.
@@ -166,27 +242,29 @@ async def search_failures(query: str, limit: int = 50) -> str:
         search_failures("cache error L1")
         search_failures("ALIBABA")
     """
-    async with get_session() as session:
-        assets = await search_assets(session, query, limit)
-        
-        result = []
-        for asset in assets:
-            result.append({
-                "serial_number": asset.serial_number,
-                "customer": asset.data.get("Customer"),
-                "error_type": asset.data.get("error_type"),
-                "status": asset.data.get("status"),
-                "location": asset.data.get("Location")
-            })
-        
-        return json.dumps({
-            "query": query,
-            "count": len(result),
-            "results": result
-        }, indent=2)
+    session = current_session()
+    assets = await search_assets(session, query, limit)
+    
+    result = []
+    for asset in assets:
+        data = asset.raw_data or {}
+        result.append({
+            "serial_number": asset.serial_number,
+            "customer": data.get("Customer"),
+            "error_type": data.get("error_type"),
+            "status": data.get("status"),
+            "location": data.get("Location")
+        })
+    
+    return _dumps({
+        "query": query,
+        "count": len(result),
+        "results": result
+    })
 
 
 @mcp.tool()
+@with_session
 async def analyze_customer(customer: str) -> str:
     """
     Get comprehensive insights for a specific customer.
@@ -206,12 +284,13 @@ async def analyze_customer(customer: str) -> str:
     Example:
         analyze_customer("ALIBABA")
     """
-    async with get_session() as session:
-        insights = await get_customer_insights(session, customer)
-        return json.dumps(insights, indent=2)
+    session = current_session()
+    insights = await get_customer_insights(session, customer)
+    return _dumps(insights)
 
 
 @mcp.tool()
+@with_session
 async def count_assets(
     customer: Optional[str] = None,
     status: Optional[str] = None,
@@ -233,71 +312,87 @@ async def count_assets(
         count_assets(customer="ALIBABA")
         count_assets(error_type="L1")
     """
-    async with get_session() as session:
-        assets = await query_assets_from_db(
-            session,
-            customer=customer,
-            status=status,
-            error_type=error_type,
-            limit=100000  # High limit to get all
-        )
-        
-        return json.dumps({
-            "filters": {
-                "customer": customer,
-                "status": status,
-                "error_type": error_type
-            },
-            "count": len(assets)
-        })
+    session = current_session()
+    count = await count_assets_filtered(
+        session,
+        customer=customer,
+        status=status,
+        error_type=error_type
+    )
+    
+    return _dumps({
+        "filters": {
+            "customer": customer,
+            "status": status,
+            "error_type": error_type
+        },
+        "count": count
+    })
 
 
 # Resources
 
 @mcp.resource("silicon-trace://database/summary")
+@async_cached()
+@with_session
 async def database_summary() -> str:
     """
     Get overview of current database state.
     Shows total assets, customers, error types, date ranges.
     """
-    async with get_session() as session:
-        summary = await get_database_summary(session)
-        return json.dumps(summary, indent=2)
+    session = current_session()
+    summary = await get_database_summary(session)
+    return _dumps(summary)
 
 
 @mcp.resource("silicon-trace://database/customers")
+@with_session
 async def customers_list() -> str:
     """
     List of all customers with failure counts.
     Updated in real-time from database.
     """
-    async with get_session() as session:
-        stats = await get_statistics(session, "customer")
-        return json.dumps(stats, indent=2)
+    session = current_session()
+    stats = await get_statistics(session, "customer")
+    return _dumps(stats)
 
 
 @mcp.resource("silicon-trace://database/error-types")
+@with_session
 async def error_types() -> str:
     """
     All unique error types seen in the database.
     Includes frequency counts.
     """
-    async with get_session() as session:
-        stats = await get_statistics(session, "error")
-        return json.dumps(stats, indent=2)
+    session = current_session()
+    stats = await get_statistics(session, "error")
+    return _dumps(stats)
 
 
 @mcp.resource("silicon-trace://database/tiers")
+@with_session
 async def tier_analysis() -> str:
     """
     Tier failure analysis showing which test stages have failures.
     """
-    async with get_session() as session:
-        stats = await get_statistics(session, "tier")
-        return json.dumps(stats, indent=2)
+    session = current_session()
+    stats = await get_statistics(session, "tier")
+    return _dumps(stats)
 
 
 # Run server
 if __name__ == "__main__":
+    # Use uvloop's faster event loop when available (asyncpg picks it up too)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
+    async def _serve():
+        # Warm the pool on the serving loop (asyncpg connections are loop-bound)
+        await warm_pool()
+        await mcp.run_sse_async()
+    
     # Run as HTTP server
-    mcp.run(transport="sse")
+    anyio.run(_serve)
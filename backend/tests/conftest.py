@@ -0,0 +1,34 @@
+"""
+Shared fixtures for the backend tests.
+The backend modules import each other as top-level modules (``from database import ...``),
+so the backend directory is put on sys.path here.
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Asset  # noqa: E402
+
+
+@pytest.fixture
+def asset() -> Asset:
+    """One ingested asset as it comes back from the database."""
+    return Asset(
+        serial_number="9AMA377P50091_100-000001359",
+        error_type="Cache L1",
+        status="failed",
+        source_filename="failures.xlsx",
+        ingest_timestamp=datetime(2025, 8, 30, 2, 54),
+        raw_data={
+            "Customer": "ALIBABA",
+            "error_type": "Cache L1",
+            "status": "failed",
+            "Location": "SLT",
+            "Mfg Date Code": "2025-05",
+        },
+    )
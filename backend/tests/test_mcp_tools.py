@@ -0,0 +1,78 @@
+"""
+MCP tool handlers, called directly with the database layer replaced by fakes.
+"""
+
+import asyncio
+
+import orjson
+import pytest
+
+pytest.importorskip("fastmcp")
+
+import silicon_trace_mcp  # noqa: E402
+
+
+class _SessionContext:
+    """Stands in for async_session(): with_session only needs an async context manager."""
+
+    async def __aenter__(self):
+        return object()
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(silicon_trace_mcp, "async_session", _SessionContext)
+    return silicon_trace_mcp
+
+
+def test_search_failures_reads_raw_data(server, monkeypatch, asset):
+    async def fake_search(session, query, limit):
+        return [asset]
+
+    monkeypatch.setattr(server, "search_assets", fake_search)
+
+    body = orjson.loads(asyncio.run(server.search_failures("ALIBABA")))
+
+    assert body == {
+        "query": "ALIBABA",
+        "count": 1,
+        "results": [{
+            "serial_number": "9AMA377P50091_100-000001359",
+            "customer": "ALIBABA",
+            "error_type": "Cache L1",
+            "status": "failed",
+            "location": "SLT",
+        }],
+    }
+
+
+def test_get_asset_details_uses_model_fields(server, monkeypatch, asset):
+    async def fake_lookup(session, serial_number):
+        return asset
+
+    monkeypatch.setattr(server, "get_asset_by_serial", fake_lookup)
+
+    body = orjson.loads(asyncio.run(server.get_asset_details(asset.serial_number)))
+
+    assert body == {
+        "serial_number": "9AMA377P50091_100-000001359",
+        "error_type": "Cache L1",
+        "status": "failed",
+        "data": asset.raw_data,
+        "source_file": "failures.xlsx",
+        "ingest_timestamp": "2025-08-30T02:54:00",
+    }
+
+
+def test_get_asset_details_not_found(server, monkeypatch):
+    async def fake_lookup(session, serial_number):
+        return None
+
+    monkeypatch.setattr(server, "get_asset_by_serial", fake_lookup)
+
+    body = orjson.loads(asyncio.run(server.get_asset_details("missing")))
+
+    assert body == {"error": "Asset not found: missing"}
@@ -0,0 +1,57 @@
+"""
+Query helpers, run against a fake session that returns preset rows.
+"""
+
+import asyncio
+from datetime import datetime
+
+from models import Asset
+from queries import get_database_summary
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class _Session:
+    """Answers every exec() with the same rows."""
+
+    def __init__(self, rows):
+        self._rows = rows
+
+    async def exec(self, statement):
+        return _Result(self._rows)
+
+
+def test_database_summary_empty():
+    summary = asyncio.run(get_database_summary(_Session([])))
+
+    assert summary == {
+        "total_assets": 0,
+        "customers": [],
+        "error_types": [],
+        "date_range": None
+    }
+
+
+def test_database_summary_with_assets(asset):
+    newer = Asset(
+        serial_number="9AMA377P50092_100-000001359",
+        source_filename="failures.xlsx",
+        ingest_timestamp=datetime(2025, 9, 1, 8, 0),
+        raw_data={"Customer": "TENCENT", "error_type": "Cache L2", "Mfg Date Code": "2025-07"},
+    )
+
+    summary = asyncio.run(get_database_summary(_Session([asset, newer])))
+
+    assert summary == {
+        "total_assets": 2,
+        "customers": ["ALIBABA", "TENCENT"],
+        "error_types": ["Cache L1", "Cache L2"],
+        "date_range": "2025-05 to 2025-07",
+        "last_updated": "2025-09-01T08:00:00"
+    }
@@ -5,15 +5,25 @@ A Streamlit frontend for ingesting Excel files and tracing hardware assets.
 """
 
 import os
+import re
+import math
+import hashlib
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from requests_toolbelt import MultipartEncoder
 import pandas as pd
-from typing import Optional, Dict, Any, List
-import json
-from langdetect import detect, LangDetectException
-import matplotlib.pyplot as plt
+from typing import Optional, Dict, Any, List, Tuple, Callable
+import orjson
+import ijson
 from datetime import datetime
-from collections import Counter
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from heapq import nlargest
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 
 # Set Streamlit configuration for larger dataframe display
 st.set_page_config(
@@ -30,6 +40,44 @@ pd.set_option('display.max_rows', 10000)
 # Configuration
 BACKEND_URL = os.getenv("API_URL", "http://localhost:8000")
 
+# Rows fetched per page in the Trace page's asset table
+ASSETS_PAGE_SIZE = 50
+
+# Uncompressed /assets bodies at least this large (bytes) are stream-parsed
+STREAM_PARSE_THRESHOLD = 256 * 1024
+
+# Full /assets loads are fetched as pages of this many rows, several in parallel
+ASSETS_FETCH_PAGE = 2000
+
+# Most recent GET responses (and total asset rows across them) whose ETag and body
+# are kept for If-None-Match revalidation
+ETAG_STORE_ENTRIES = 64
+ETAG_STORE_ROWS = 60000
+
+
+@st.cache_resource
+def _client() -> requests.Session:
+    """
+    Shared HTTP session for all backend calls.
+    Cached as a resource so the keep-alive connection pool survives reruns.
+    The backend (uvicorn) only speaks HTTP/1.1, so concurrent calls get a
+    pooled connection each rather than HTTP/2 multiplexing; pool_maxsize
+    covers the parallel upload workers.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=2, backoff_factor=0.2),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Accept": "application/json", "Accept-Encoding": "gzip, br"})
+    return session
+
+
+SESSION = _client()
+
 # Common Chinese to English translations for hardware terms
 TRANSLATION_MAP = {
     # Status terms
@@ -82,15 +130,70 @@ TRANSLATION_MAP = {
     '待定': 'Pending',
 }
 
+# CJK Unified Ideographs
+_CJK_RE = re.compile(r'[\u4e00-\u9fff]')
+
+# All dictionary terms in one alternation, longest first so e.g. '已测试'
+# wins over '测试'; translate_text makes a single pass with it
+_TRANS_RE = re.compile('|'.join(map(re.escape, sorted(TRANSLATION_MAP, key=len, reverse=True))))
+# Inline replacement for each term, built once instead of per match
+_TRANS_INLINE = {chinese: f"{chinese}[{english}]" for chinese, english in TRANSLATION_MAP.items()}
+
+
+def _keyword_re(keywords: List[str]) -> re.Pattern:
+    """Compile substring keywords into one alternation so a key is scanned once"""
+    return re.compile('|'.join(map(re.escape, keywords)))
+
+
+# Schema mapping for bilingual support (Chinese/English)
+SCHEMA_MAP = {
+    'sn': ['sn', 'serial', 'serial_number', 'serialnumber', 'cpu_sn', 'cpu sn', 
+           '2d_barcode_sn', '2d barcode', 'system_sn', 'system sn'],
+    'date': ['fail date', 'failed date', 'failure date', 'deploy date', 'deployment date',
+             'slt date', 'slt_date', 'fail_date', 'failed_date', 'failure_date', 'deploy_date',
+             'rma date', 'rma_date', 'date', 'date code', 'date_code', 'datecode', '日期', '故障日期'],
+    'error': ['error', 'error_type', 'symptom', 'fail test', 'fail test case', 
+              '错误', '故障类型', 'issue', 'failure', 'problem'],
+    'status': ['status', 'state', 'fa_status', 'fa status', '状态', 'fa状态', 
+               'fa 状态', 'rma status', 'rma_status'],
+    'component': ['component', 'part', 'module', 'unit', '部件', 'cpu', 'gpu', 
+                  'dimm', 'memory', 'disk', 'drive'],
+    'location': ['location', 'site', 'lab', 'datacenter', 'data center', '机房', 
+                 '南通机房', 'nantong', '是否南通机房', 'room']
+}
+
+# One pattern per field type, searched against lowercased column names
+SCHEMA_RES = {field_type: _keyword_re(keywords) for field_type, keywords in SCHEMA_MAP.items()}
+PRIORITY_DATE_RE = _keyword_re(['fail date', 'failed date', 'failure date', 'deploy date', 'deployment date', 'slt date'])
+DATE_KEYWORDS = frozenset(SCHEMA_MAP['date'])
+
+# Column-name keywords for the asset detail tabs
+IDENTITY_KEY_RE = _keyword_re(['system', 'cpu', 'sn', 'barcode', 'ppid', 'odm', 'location', '机房', 'vendor'])
+DATE_KEY_RE = _keyword_re(['date', 'time', 'day', '日期', 'deploy', 'fail', 'rma', 'ship'])
+TECH_KEY_RE = _keyword_re(['error', 'fail', 'status', 'bios', 'firmware', 'log', 'symptom', 'issue',
+                           'test', 'code', 'version', '状态', '错误'])
+
+# Column-name keywords for the Trace group analysis tabs
+TIER_DATE_KEY_RE = _keyword_re(['date', 'time', 'mfg', 'deploy', 'rma', 'fail', 'ticket'])
+PLATFORM_KEY_RE = _keyword_re(['platform', 'platf orm', 'model', 'type', 'sku', 'product'])
+
+# Customer columns: exact keyword or keyword followed by ' ' / '_' (avoid false positives)
+CUSTOMER_KEY_RE = re.compile(
+    '(?:%s)(?:$|[ _])' % '|'.join(map(re.escape, ['customer', 'client', 'end_customer', 'end customer',
+                                                   'customer_name', 'customer name', '客户']))
+)
+
+# Customer columns by substring, for the Analytics/Trace scans. 'cust' already covers
+# customer / end_customer / customer_name / customer name
+CUSTOMER_SUBSTR_RE = _keyword_re(['cust', 'client', '客户'])
+CUSTOMER_WORD_RE = _keyword_re(['customer', 'client'])
+
 
 def has_chinese(text: str) -> bool:
     """Check if text contains Chinese characters"""
     if not text:
         return False
-    for char in str(text):
-        if '\u4e00' <= char <= '\u9fff':
-            return True
-    return False
+    return _CJK_RE.search(str(text)) is not None
 
 
 def translate_text(text: str) -> str:
@@ -101,7 +204,13 @@ def translate_text(text: str) -> str:
     if not text or not isinstance(text, str):
         return str(text) if text else 'N/A'
     
-    text_str = str(text).strip()
+    return _translate_str(text)
+
+
+@lru_cache(maxsize=8192)
+def _translate_str(text: str) -> str:
+    """translate_text for non-empty strings; cached since values repeat across assets"""
+    text_str = text.strip()
     
     # Check if text contains Chinese characters
     if not has_chinese(text_str):
@@ -112,13 +221,7 @@ def translate_text(text: str) -> str:
         return f"{text_str} ({TRANSLATION_MAP[text_str]})"
     
     # Check for partial matches and translate each part
-    translated_parts = []
-    found_translation = False
-    
-    for chinese, english in TRANSLATION_MAP.items():
-        if chinese in text_str:
-            text_str = text_str.replace(chinese, f"{chinese}[{english}]")
-            found_translation = True
+    text_str, found_translation = _TRANS_RE.subn(lambda m: _TRANS_INLINE[m.group(0)], text_str)
     
     if found_translation:
         return f"{text_str} (translated, may not be 100% accurate)"
@@ -131,7 +234,7 @@ if 'page' not in st.session_state:
     st.session_state.page = 'Dashboard'
 
 # Custom CSS for better styling
-st.markdown("""
+CUSTOM_CSS = """
     <style>
     /* Sidebar styling */
     [data-testid="stSidebar"] {
@@ -265,118 +368,353 @@ st.markdown("""
         padding-top: 2rem;
     }
     </style>
-""", unsafe_allow_html=True)
+"""
+
+FOOTER_HTML = (
+    "<div style='text-align: center; color: #666;'>"
+    "Silicon Trace v3.0 | Built with FastAPI & Streamlit"
+    "</div>"
+)
 
+# Streamlit drops elements a rerun doesn't re-emit, so the styles are injected every run
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
+
+@st.cache_data(ttl=10, show_spinner=False)
 def check_backend_health() -> bool:
-    """Check if backend is accessible"""
+    """Check if backend is accessible (cached briefly so reruns don't block on it)"""
     try:
-        response = requests.get(f"{BACKEND_URL}/", timeout=5)
+        response = SESSION.get(f"{BACKEND_URL}/", timeout=2)
         return response.status_code == 200
     except:
         return False
 
 
-def upload_file(file) -> Optional[Dict[str, Any]]:
-    """Upload Excel file to backend"""
+def _error_detail(response: requests.Response) -> str:
+    """The backend's error detail, or the HTTP status when the body isn't JSON (e.g. a proxy error page)"""
     try:
-        files = {"file": (file.name, file, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
-        response = requests.post(f"{BACKEND_URL}/upload", files=files, timeout=180)
+        return orjson.loads(response.content).get("detail", "Unknown error")
+    except (orjson.JSONDecodeError, AttributeError):
+        return f"HTTP {response.status_code} {response.reason}"
+
+
+def _send_upload(file) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Upload a file to the backend and return (result, error message).
+    Does not touch Streamlit, so it is safe to call from worker threads.
+    """
+    try:
+        # Stream the multipart body from the file instead of buffering it all
+        file.seek(0)
+        encoder = MultipartEncoder(
+            fields={"file": (file.name, file, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")}
+        )
+        response = SESSION.post(
+            f"{BACKEND_URL}/upload",
+            data=encoder,
+            headers={"Content-Type": encoder.content_type},
+            timeout=180
+        )
         
         if response.status_code == 200:
-            return response.json()
+            return orjson.loads(response.content), None
         else:
-            error_detail = response.json().get("detail", "Unknown error")
-            st.error(f"Upload failed: {error_detail}")
-            return None
+            return None, f"Upload failed: {_error_detail(response)}"
     except requests.exceptions.RequestException as e:
-        st.error(f"Connection error: {str(e)}")
+        return None, f"Connection error: {str(e)}"
+    except orjson.JSONDecodeError as e:
+        return None, f"Invalid response from backend: {str(e)}"
+
+
+def upload_file(file) -> Optional[Dict[str, Any]]:
+    """Upload Excel file to backend"""
+    result, error = _send_upload(file)
+    if error:
+        st.error(error)
+    return result
+
+
+class BackendError(Exception):
+    """A backend read failed; the message is what the user is shown"""
+
+
+def _shown(fetch: Callable[..., Any], *args) -> Any:
+    """
+    Call a cached fetcher, showing a BackendError with st.error and returning None.
+    The fetchers raise instead of returning None so a failure is never cached.
+    """
+    try:
+        return fetch(*args)
+    except BackendError as e:
+        st.error(str(e))
         return None
 
 
-def search_asset(serial_number: str) -> Optional[Dict[str, Any]]:
-    """Search for an asset by serial number"""
+@st.cache_data(ttl=30, show_spinner=False)
+def _fetch_asset(serial_number: str) -> Optional[Dict[str, Any]]:
     try:
-        response = requests.get(f"{BACKEND_URL}/assets/{serial_number}", timeout=10)
+        response = SESSION.get(f"{BACKEND_URL}/assets/{serial_number}", timeout=10)
         
         if response.status_code == 200:
-            return response.json()
+            return orjson.loads(response.content)
         elif response.status_code == 404:
             return None
         else:
-            st.error(f"Search failed: {response.json().get('detail', 'Unknown error')}")
-            return None
+            raise BackendError(f"Search failed: {_error_detail(response)}")
     except requests.exceptions.RequestException as e:
-        st.error(f"Connection error: {str(e)}")
-        return None
+        raise BackendError(f"Connection error: {str(e)}") from e
+    except orjson.JSONDecodeError as e:
+        raise BackendError(f"Invalid response from backend: {str(e)}") from e
 
 
-def search_assets(query: str) -> Optional[Dict[str, Any]]:
-    """Search for assets matching a query"""
+def search_asset(serial_number: str) -> Optional[Dict[str, Any]]:
+    """Search for an asset by serial number"""
+    return _shown(_fetch_asset, serial_number)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _fetch_search(query: str) -> Dict[str, Any]:
     try:
-        response = requests.get(f"{BACKEND_URL}/search", params={"q": query}, timeout=10)
+        response = SESSION.get(f"{BACKEND_URL}/search", params={"q": query}, timeout=10)
         
         if response.status_code == 200:
-            return response.json()
+            return orjson.loads(response.content)
         else:
-            st.error(f"Search failed: {response.json().get('detail', 'Unknown error')}")
-            return None
+            raise BackendError(f"Search failed: {_error_detail(response)}")
     except requests.exceptions.RequestException as e:
-        st.error(f"Connection error: {str(e)}")
-        return None
+        raise BackendError(f"Connection error: {str(e)}") from e
+    except orjson.JSONDecodeError as e:
+        raise BackendError(f"Invalid response from backend: {str(e)}") from e
 
 
-def get_source_files() -> Optional[List[Dict[str, Any]]]:
-    """Get list of all source files"""
+def search_assets(query: str) -> Optional[Dict[str, Any]]:
+    """Search for assets matching a query (an exact serial number match comes first)"""
+    return _shown(_fetch_search, query)
+
+
+@st.cache_resource
+def _etag_store() -> Tuple["OrderedDict[str, Tuple[str, Any, int]]", Lock]:
+    """
+    Last (ETag, decoded body, asset rows) per GET, shared across reruns and sessions.
+    Least recently used entries are evicted beyond ETAG_STORE_ENTRIES or ETAG_STORE_ROWS;
+    the lock guards it against the paged fetch's worker threads.
+    """
+    return OrderedDict(), Lock()
+
+
+def _conditional_get(path: str, params: Optional[Dict[str, Any]] = None, timeout: int = 10,
+                     decode: Callable[[requests.Response], Any] = None) -> Tuple[int, Any, Optional[str]]:
+    """
+    GET a backend path with If-None-Match, reusing the stored body on 304.
+    Returns (status code, decoded body, ETag); a revalidated 304 is reported as 200.
+    """
+    key = f"{path}?{sorted((params or {}).items())}"
+    store, lock = _etag_store()
+    with lock:
+        cached = store.get(key)
+        if cached:
+            store.move_to_end(key)
+    headers = {"If-None-Match": cached[0]} if cached else None
+    
+    with SESSION.get(f"{BACKEND_URL}{path}", params=params, headers=headers, timeout=timeout, stream=True) as response:
+        if response.status_code == 304 and cached:
+            return 200, cached[1], cached[0]
+        if response.status_code != 200:
+            return response.status_code, None, None
+        
+        body = decode(response) if decode else orjson.loads(response.content)
+        etag = response.headers.get("ETag")
+        if etag:
+            rows = len(body.get('assets', ())) if isinstance(body, dict) else 0
+            with lock:
+                store[key] = (etag, body, rows)
+                store.move_to_end(key)
+                while len(store) > ETAG_STORE_ENTRIES or sum(entry[2] for entry in store.values()) > ETAG_STORE_ROWS:
+                    store.popitem(last=False)
+        return 200, body, etag
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _fetch_source_files() -> List[Dict[str, Any]]:
     try:
-        response = requests.get(f"{BACKEND_URL}/source-files", timeout=10)
+        status_code, body, _ = _conditional_get("/source-files", timeout=10)
         
-        if response.status_code == 200:
-            return response.json().get("source_files", [])
+        if status_code == 200:
+            return body.get("source_files", [])
         else:
-            st.error(f"Failed to fetch source files")
-            return None
+            raise BackendError("Failed to fetch source files")
     except requests.exceptions.RequestException as e:
-        st.error(f"Connection error: {str(e)}")
-        return None
+        raise BackendError(f"Connection error: {str(e)}") from e
+    except orjson.JSONDecodeError as e:
+        raise BackendError(f"Invalid response from backend: {str(e)}") from e
+
+
+def get_source_files() -> Optional[List[Dict[str, Any]]]:
+    """Get list of all source files"""
+    return _shown(_fetch_source_files)
 
 
 def delete_source_file(filename: str) -> Optional[Dict[str, Any]]:
     """Delete all assets from a source file"""
     try:
-        response = requests.delete(f"{BACKEND_URL}/source-files/{filename}", timeout=30)
+        response = SESSION.delete(f"{BACKEND_URL}/source-files/{filename}", timeout=30)
         
         if response.status_code == 200:
-            return response.json()
+            return orjson.loads(response.content)
         else:
-            error_detail = response.json().get("detail", "Unknown error")
-            st.error(f"Delete failed: {error_detail}")
+            st.error(f"Delete failed: {_error_detail(response)}")
             return None
     except requests.exceptions.RequestException as e:
         st.error(f"Connection error: {str(e)}")
         return None
+    except orjson.JSONDecodeError as e:
+        st.error(f"Invalid response from backend: {str(e)}")
+        return None
 
 
-def get_assets_filtered(source_files: List[str] = None, limit: int = 50000) -> Optional[Dict[str, Any]]:
-    """Get assets with optional filtering by source files"""
+def _read_assets_payload(response: requests.Response) -> Dict[str, Any]:
+    """
+    Decode an /assets response opened with stream=True.
+    Large bodies are parsed incrementally with ijson so the raw bytes and
+    the parsed objects are never held in memory at the same time. With a
+    Content-Encoding (the backend gzips), Content-Length is the compressed
+    size and says nothing about the decoded one, so such bodies are always streamed.
+    """
+    length = int(response.headers.get("Content-Length") or 0)
+    encoded = response.headers.get("Content-Encoding", "identity").lower() != "identity"
+    if length and not encoded and length < STREAM_PARSE_THRESHOLD:
+        return orjson.loads(response.content)
+    
+    response.raw.decode_content = True
+    assets = list(ijson.items(response.raw, 'assets.item', use_float=True))
+    return {'total': len(assets), 'assets': assets}
+
+
+def _get_assets_paged(params: Dict[str, Any]) -> Tuple[int, Any, Optional[str]]:
+    """
+    Fetch /assets as ASSETS_FETCH_PAGE-sized skip/limit pages until a page comes back
+    short (or params["limit"] rows are in). The first page is fetched alone; after that
+    pages go out in waves on a small thread pool, so transfer and parsing overlap.
+    Pages are separate snapshots, so an asset repeated across a page boundary by a
+    concurrent write is kept once. The returned ETag joins the page ETags (None if any
+    page lacked one).
+    """
+    limit = params["limit"]
+    pages = []
+    etags = []
+    
+    executor = ThreadPoolExecutor(max_workers=4)
     try:
-        params = {"limit": limit}
+        offset = 0
+        wave = 1
+        while offset < limit:
+            offsets = range(offset, min(limit, offset + wave * ASSETS_FETCH_PAGE), ASSETS_FETCH_PAGE)
+            futures = [
+                executor.submit(_conditional_get, "/assets",
+                                {**params, "limit": min(ASSETS_FETCH_PAGE, limit - page_offset), "skip": page_offset},
+                                60, _read_assets_payload)
+                for page_offset in offsets
+            ]
+            
+            short_page = False
+            for page_offset, future in zip(offsets, futures):
+                status_code, body, etag = future.result()
+                if status_code != 200:
+                    return status_code, None, None
+                pages.append(body['assets'])
+                etags.append(etag)
+                if len(body['assets']) < min(ASSETS_FETCH_PAGE, limit - page_offset):
+                    short_page = True
+                    break
+            if short_page:
+                break
+            
+            offset = offsets[-1] + ASSETS_FETCH_PAGE
+            wave = 4
+    finally:
+        # Don't wait on pages past a short or failed one
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    seen = set()
+    assets = []
+    for page in pages:
+        for asset in page:
+            if asset.get('id') not in seen:
+                seen.add(asset.get('id'))
+                assets.append(asset)
+    version = '|'.join(etags) if all(etags) else None
+    return 200, {'total': len(assets), 'assets': assets}, version
+
+
+def _content_version(assets: List[Dict[str, Any]]) -> str:
+    """Hash of the asset list, for responses that came without an ETag"""
+    return hashlib.blake2b(orjson.dumps(assets, default=str), digest_size=16).hexdigest()
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _fetch_assets(source_files: Optional[Tuple[str, ...]], limit: int, offset: int) -> Dict[str, Any]:
+    try:
+        params = {"limit": limit, "skip": offset}
         if source_files:
             params["source_files"] = ",".join(source_files)
         
-        response = requests.get(f"{BACKEND_URL}/assets", params=params, timeout=60)
-        
-        if response.status_code == 200:
-            return response.json()
+        # Page full loads; the page sizes themselves tell when the data ends
+        if offset == 0 and limit > ASSETS_FETCH_PAGE:
+            status_code, body, version = _get_assets_paged(params)
         else:
-            st.error(f"Failed to fetch assets: Status {response.status_code}")
-            return None
-    except requests.exceptions.Timeout:
-        st.error("Request timed out. Try reducing the data size or using filters.")
-        return None
+            status_code, body, version = _conditional_get("/assets", params=params, timeout=60, decode=_read_assets_payload)
+        
+        if status_code == 200:
+            # Derive the key columns once per fetch; cached copies carry them along
+            for asset in body['assets']:
+                if '_key_cols' not in asset:
+                    asset['_key_cols'] = get_key_columns(asset)
+            # Content signature of this asset list, for caches derived from it
+            return {**body, 'version': version or _content_version(body['assets'])}
+        else:
+            raise BackendError(f"Failed to fetch assets: Status {status_code}")
+    except (ijson.JSONError, orjson.JSONDecodeError) as e:
+        raise BackendError(f"Failed to parse assets response: {str(e)}") from e
+    except requests.exceptions.Timeout as e:
+        raise BackendError("Request timed out. Try reducing the data size or using filters.") from e
     except requests.exceptions.RequestException as e:
-        st.error(f"Connection error: {str(e)}")
-        return None
+        raise BackendError(f"Connection error: {str(e)}") from e
+
+
+def get_assets_filtered(source_files: Optional[Tuple[str, ...]] = None, limit: int = 50000, offset: int = 0) -> Optional[Dict[str, Any]]:
+    """Get assets with optional filtering by source files"""
+    return _shown(_fetch_assets, source_files, limit, offset)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def build_search_haystack(version: str, _assets: List[Dict[str, Any]]) -> pd.Series:
+    """
+    One lowercased search string per asset: serial number, error type, status and every
+    non-empty raw_data value, NUL-separated so a term never matches across two fields.
+    Keyed on the fetched data's version, so positions always line up with the
+    asset list they were built from; the list itself is not hashed.
+    """
+    return pd.Series([
+        '\0'.join([
+            asset.get('serial_number', ''),
+            asset.get('error_type') or '',
+            asset.get('status') or '',
+            *(str(value) for value in (asset.get('raw_data') or {}).values() if value)
+        ])
+        for asset in _assets
+    ], dtype=object).str.lower()
+
+
+def invalidate_data_caches():
+    """Drop cached backend reads after uploads or deletes change the data"""
+    _fetch_source_files.clear()
+    _fetch_assets.clear()
+    build_search_haystack.clear()
+    build_complete_view_df.clear()
+    compute_dashboard_metrics.clear()
+    _fetch_asset.clear()
+    _fetch_search.clear()
+    st.session_state.pop('last_search', None)
 
 
 def display_asset_card(asset: Dict[str, Any]):
@@ -389,25 +727,21 @@ def display_asset_card(asset: Dict[str, Any]):
     
     # Display all data from raw_data in a clean format
     if asset.get('raw_data'):
-        # Create columns dynamically based on number of fields
         raw_data = asset['raw_data']
-        # Filter out metadata fields
-        display_data = {k: v for k, v in raw_data.items() if not k.startswith('_') and v is not None}
-        
-        if display_data:
-            # Display in 2-column layout
-            items = list(display_data.items())
-            for i in range(0, len(items), 2):
-                cols = st.columns(2)
-                for j, (key, value) in enumerate(items[i:i+2]):
-                    with cols[j]:
-                        st.markdown(f"**{key}**")
-                        st.write(str(value))
+        # Filter out metadata fields; (field, value) rows built in one pass
+        pairs = [(k, str(v)) for k, v in raw_data.items() if not k.startswith('_') and v is not None]
+        
+        if pairs:
+            # One table element instead of a row of columns per field pair
+            st.table(pd.DataFrame(pairs, columns=["Field", "Value"]))
     
     st.markdown("---")
     
     # Metadata
-    col1, col2 = st.columns(2)
+    st.table(pd.DataFrame({
+        "Field": ["Source File", "Ingested"],
+        "Value": [str(asset.get('source_filename', 'N/A')), str(asset.get('ingest_timestamp', 'N/A'))]
+    }))
 
 
 def display_asset_details_modal(asset: Dict[str, Any]):
@@ -417,6 +751,8 @@ def display_asset_details_modal(asset: Dict[str, Any]):
     tab1, tab2, tab3, tab4 = st.tabs(["🆔 Identity", "📅 Timeline", "🔧 Technical", "📄 Raw Data"])
     
     raw_data = asset.get('raw_data', {})
+    # Lowercase each visible key once for the keyword scans below
+    lowered = [(key, key.lower(), value) for key, value in raw_data.items() if not key.startswith('_')]
     
     # Tab 1: Identity
     with tab1:
@@ -435,10 +771,8 @@ def display_asset_details_modal(asset: Dict[str, Any]):
         
         # System info
         identity_fields = {}
-        identity_keywords = ['system', 'cpu', 'sn', 'barcode', 'ppid', 'odm', 'location', '机房', 'vendor']
-        
-        for key, value in raw_data.items():
-            if not key.startswith('_') and any(kw in key.lower() for kw in identity_keywords):
+        for key, key_lower, value in lowered:
+            if IDENTITY_KEY_RE.search(key_lower):
                 identity_fields[key] = value
         
         if identity_fields:
@@ -451,10 +785,8 @@ def display_asset_details_modal(asset: Dict[str, Any]):
         
         # Extract date-related fields
         date_fields = {}
-        date_keywords = ['date', 'time', 'day', '日期', 'deploy', 'fail', 'rma', 'ship']
-        
-        for key, value in raw_data.items():
-            if not key.startswith('_') and any(kw in key.lower() for kw in date_keywords):
+        for key, key_lower, value in lowered:
+            if DATE_KEY_RE.search(key_lower):
                 date_fields[key] = value
         
         if date_fields:
@@ -473,11 +805,8 @@ def display_asset_details_modal(asset: Dict[str, Any]):
         
         # Extract technical fields
         tech_fields = {}
-        tech_keywords = ['error', 'fail', 'status', 'bios', 'firmware', 'log', 'symptom', 'issue', 
-                        'test', 'code', 'version', '状态', '错误']
-        
-        for key, value in raw_data.items():
-            if not key.startswith('_') and any(kw in key.lower() for kw in tech_keywords):
+        for key, key_lower, value in lowered:
+            if TECH_KEY_RE.search(key_lower):
                 tech_fields[key] = value
         
         if tech_fields:
@@ -499,23 +828,6 @@ def get_key_columns(asset: Dict[str, Any]) -> Dict[str, str]:
     """Extract the 'Golden 5' columns from an asset"""
     raw_data = asset.get('raw_data', {})
     
-    # Schema mapping for bilingual support (Chinese/English)
-    SCHEMA_MAP = {
-        'sn': ['sn', 'serial', 'serial_number', 'serialnumber', 'cpu_sn', 'cpu sn', 
-               '2d_barcode_sn', '2d barcode', 'system_sn', 'system sn'],
-        'date': ['fail date', 'failed date', 'failure date', 'deploy date', 'deployment date',
-                 'slt date', 'slt_date', 'fail_date', 'failed_date', 'failure_date', 'deploy_date',
-                 'rma date', 'rma_date', 'date', 'date code', 'date_code', 'datecode', '日期', '故障日期'],
-        'error': ['error', 'error_type', 'symptom', 'fail test', 'fail test case', 
-                  '错误', '故障类型', 'issue', 'failure', 'problem'],
-        'status': ['status', 'state', 'fa_status', 'fa status', '状态', 'fa状态', 
-                   'fa 状态', 'rma status', 'rma_status'],
-        'component': ['component', 'part', 'module', 'unit', '部件', 'cpu', 'gpu', 
-                      'dimm', 'memory', 'disk', 'drive'],
-        'location': ['location', 'site', 'lab', 'datacenter', 'data center', '机房', 
-                     '南通机房', 'nantong', '是否南通机房', 'room']
-    }
-    
     result = {
         'Serial Number': asset['serial_number'],
         'Date': 'N/A',
@@ -524,58 +836,107 @@ def get_key_columns(asset: Dict[str, Any]) -> Dict[str, str]:
         'Component': 'N/A'
     }
     
-    # Try to match fields using schema map (no translation here for performance)
+    # Match fields using schema map in a single pass over the columns, noting the first
+    # hit for every lookup (no translation here for performance)
     # IMPORTANT: Skip 'error' field lookup since we use normalized error_type from database
-    for display_name, field_type in [('Date', 'date'), 
-                                     ('Status', 'status'), ('Component', 'component')]:
-        keywords = SCHEMA_MAP.get(field_type, [])
-        
-        if field_type == 'date':
-            # Priority-based date field matching with fallback
-            # 1. Try exact matches from high-priority date fields (full datetime preferred)
-            priority_keywords = ['fail date', 'failed date', 'failure date', 'deploy date', 'deployment date', 'slt date']
-            for key, value in raw_data.items():
-                key_lower = key.lower().strip()
-                if not key_lower.startswith('_') and value and any(kw in key_lower for kw in priority_keywords):
-                    result[display_name] = str(value)
-                    break
-            
-            # 2. If no priority match, try all date keywords
-            if result[display_name] == 'N/A':
-                for key, value in raw_data.items():
-                    if not key.startswith('_') and any(kw == key.lower() for kw in keywords):
-                        result[display_name] = str(value) if value else 'N/A'
-                        break
-            
-            # 3. If still no match, try partial matches
-            if result[display_name] == 'N/A':
-                for key, value in raw_data.items():
-                    if not key.startswith('_') and any(kw in key.lower() for kw in keywords):
-                        result[display_name] = str(value) if value else 'N/A'
-                        break
-            
-            # 4. Final fallback: any field containing "date" (but skip if it's just a number like datecode:2451)
-            if result[display_name] == 'N/A':
-                for key, value in raw_data.items():
-                    if not key.startswith('_') and 'date' in key.lower() and value:
-                        # Skip if value looks like just a year/number (e.g., 2451, 2025)
-                        if not (str(value).isdigit() and len(str(value)) <= 4):
-                            result[display_name] = str(value)
-                            break
-        else:
-            # For non-date fields, use original logic
-            for key, value in raw_data.items():
-                if not key.startswith('_') and any(kw in key.lower() for kw in keywords):
-                    if field_type == 'status' and value:
-                        # Smart status extraction for messy status fields
-                        result[display_name] = extract_status_from_text(str(value))
-                    else:
-                        result[display_name] = str(value) if value else 'N/A'
-                    break
+    # Date candidates in priority order (first one that isn't N/A wins):
+    #   0. high-priority date fields (full datetime preferred)
+    #   1. exact date keywords, 2. partial date keywords
+    #   3. any field containing "date" (but skip if it's just a number like datecode:2451)
+    dates = [None, None, None, None]
+    status = component = None
+    date_re, status_re, component_re = SCHEMA_RES['date'], SCHEMA_RES['status'], SCHEMA_RES['component']
+    
+    for key, value in raw_data.items():
+        if key.startswith('_'):
+            continue
+        key_lower = key.lower()
+        
+        if dates[0] is None and value and PRIORITY_DATE_RE.search(key_lower):
+            dates[0] = str(value)
+        if dates[1] is None and key_lower in DATE_KEYWORDS:
+            dates[1] = str(value) if value else 'N/A'
+        if dates[2] is None and date_re.search(key_lower):
+            dates[2] = str(value) if value else 'N/A'
+        if dates[3] is None and value and 'date' in key_lower:
+            # Skip if value looks like just a year/number (e.g., 2451, 2025)
+            if not (str(value).isdigit() and len(str(value)) <= 4):
+                dates[3] = str(value)
+        if status is None and status_re.search(key_lower):
+            # Smart status extraction for messy status fields
+            status = extract_status_from_text(str(value)) if value else 'N/A'
+        if component is None and component_re.search(key_lower):
+            component = str(value) if value else 'N/A'
+        
+        if dates[0] not in (None, 'N/A') and status is not None and component is not None:
+            break
+    
+    result['Date'] = next((date for date in dates if date is not None and date != 'N/A'), 'N/A')
+    if status is not None:
+        result['Status'] = status
+    if component is not None:
+        result['Component'] = component
     
     return result
 
 
+@st.cache_data(ttl=300, max_entries=8, show_spinner=False)
+def build_complete_view_df(version: str, asset_ids: Tuple[str, ...], _assets: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Flatten assets into the Complete View table with every raw_data column.
+    Columns normalized for analytics in any asset are prefixed with 🔄.
+    Cached on the fetched data's version and the ids of the shown assets (a search
+    shows a subset); the list itself is not hashed. Merge uploads keep
+    ingest_timestamp, so the version is what changes with the content.
+    """
+    df = pd.json_normalize(_assets, max_level=1)
+    
+    raw_cols = df.loc[:, df.columns.str.startswith('raw_data.')]
+    raw_cols.columns = raw_cols.columns.str.slice(len('raw_data.'))
+    raw_cols = raw_cols.loc[:, ~raw_cols.columns.str.startswith('_')]
+    
+    # Collect normalization metadata across all assets in one pass
+    normalized_keys = set()
+    error_sources = set()
+    for a in _assets:
+        raw_data = a.get('raw_data') or {}
+        for key, category in raw_data.get('_column_classification', {}).items():
+            if category in ("ERROR_TYPE", "STATUS"):
+                normalized_keys.add(key)
+        error_sources.update(str(src) for src in raw_data.get('_error_sources', []))
+    
+    def display_key(key: str) -> str:
+        if key in normalized_keys or any(key in src for src in error_sources):
+            return f"🔄 {key}"
+        return key
+    
+    raw_cols = raw_cols.rename(columns=display_key).apply(_arrow_column)
+    
+    base = pd.concat([
+        df['serial_number'].astype(str).rename('Serial Number'),
+        df['ingest_timestamp'].str.slice(0, 10).fillna('N/A').rename('Ingested'),
+        df['source_filename'].fillna('N/A').astype(str).rename('Source File'),
+    ], axis=1).astype('string[pyarrow]')
+    # raw_data values win over the basic columns on a name clash
+    base = base.drop(columns=base.columns.intersection(raw_cols.columns))
+    
+    return pd.concat([base, raw_cols], axis=1)
+
+
+def _arrow_column(col: pd.Series) -> pd.Series:
+    """
+    Give a raw_data column an Arrow dtype that st.dataframe can serialize.
+    Columns holding only JSON numbers stay numeric; anything else (including
+    numeric-looking strings such as serials with leading zeros) becomes a
+    string column, which is what avoids Arrow's mixed-type errors. Missing
+    values stay <NA> so Arrow keeps them as real nulls.
+    """
+    values = col.dropna()
+    if len(values) and values.map(lambda v: isinstance(v, (int, float)) and not isinstance(v, bool)).all():
+        return pd.to_numeric(col).convert_dtypes(dtype_backend='pyarrow')
+    return col.map(str, na_action='ignore').astype('string[pyarrow]')
+
+
 def extract_tier_name(column_name: str) -> str:
     """
     Extract tier name while preserving structure from Excel headers.
@@ -623,6 +984,52 @@ def extract_tier_name(column_name: str) -> str:
     return cleaned[:12].upper()
 
 
+# Status keywords in priority order: when several appear, the earliest row wins
+_EN_STATUS_TABLE = [
+    (['closed'], 'Closed'),
+    (['received'], 'Lab Received'),
+    (['open'], 'Open'),
+    (['pending', 'awaiting'], 'Pending'),
+    (['in progress', 'investigating'], 'In Progress'),
+    (['completed', 'resolved'], 'Completed'),
+    (['fail'], 'Failed'),
+    (['pass'], 'Passed'),
+    (['test'], 'Testing'),
+    (['ship'], 'Shipped'),
+    (['returned', 'rma'], 'Returned'),
+]
+_ZH_STATUS_TABLE = [
+    (['关闭'], 'Closed'),
+    (['开'], 'Open'),
+    (['待处理', '等待'], 'Pending'),
+    (['进行中', '处理中'], 'In Progress'),
+    (['完成'], 'Completed'),
+    (['修复'], 'Repaired'),
+    (['测试'], 'Tested'),
+    (['失败', '错误'], 'Failed'),
+    (['通过'], 'Passed'),
+    (['正常'], 'Normal'),
+]
+
+
+def _status_re(table: List[Tuple[List[str], str]]) -> re.Pattern:
+    """One alternation with a named group (s<priority>) per status row"""
+    return re.compile('|'.join(
+        f"(?P<s{i}>{'|'.join(map(re.escape, keywords))})" for i, (keywords, _) in enumerate(table)
+    ))
+
+
+_EN_STATUS_RE = _status_re(_EN_STATUS_TABLE)
+_ZH_STATUS_RE = _status_re(_ZH_STATUS_TABLE)
+
+
+def _match_status(pattern: re.Pattern, table: List[Tuple[List[str], str]], text: str) -> Optional[str]:
+    """Label of the highest-priority status keyword found in text, if any"""
+    best = min((int(m.lastgroup[1:]) for m in pattern.finditer(text)), default=None)
+    return None if best is None else table[best][1]
+
+
+@lru_cache(maxsize=8192)
 def extract_status_from_text(text: str) -> str:
     """
     Intelligently extract actual status from potentially messy status fields.
@@ -643,76 +1050,20 @@ def extract_status_from_text(text: str) -> str:
             return 'Unknown'
     
     # Check for Chinese status terms FIRST and translate to English
-    if any('\u4e00' <= char <= '\u9fff' for char in text):
+    if _CJK_RE.search(text):
         # Has Chinese characters - translate common status terms
-        text_to_check = text.lower()
-        
-        if '已关闭' in text or '关闭' in text:
-            return 'Closed'
-        if '已打开' in text or '打开' in text or '开' in text:
-            return 'Open'
-        if '待处理' in text or '等待' in text:
-            return 'Pending'
-        if '进行中' in text or '处理中' in text:
-            return 'In Progress'
-        if '已完成' in text or '完成' in text:
-            return 'Completed'
-        if '已修复' in text or '修复' in text:
-            return 'Repaired'
-        if '待修复' in text:
-            return 'Pending Repair'
-        if '已测试' in text or '测试' in text:
-            return 'Tested'
-        if '测试中' in text:
-            return 'Testing'
-        if '失败' in text or '错误' in text:
-            return 'Failed'
-        if '通过' in text:
-            return 'Passed'
-        if '正常' in text:
-            return 'Normal'
-        
         # If we have Chinese but no known pattern, return as "Other (Chinese)"
-        return 'Other'
+        return _match_status(_ZH_STATUS_RE, _ZH_STATUS_TABLE, text) or 'Other'
     
     # Normalize and categorize common English status patterns
     text_lower = text.lower()
     
     # Map variations to standard categories
-    if 'closed' in text_lower:
-        if 'known' in text_lower or 'issue' in text_lower:
-            return 'Closed - Known Issue'
-        return 'Closed'
-    
-    if 'lab received' in text_lower or 'received' in text_lower:
-        return 'Lab Received'
-    
-    if 'open' in text_lower:
-        return 'Open'
-    
-    if 'pending' in text_lower or 'awaiting' in text_lower:
-        return 'Pending'
-    
-    if 'in progress' in text_lower or 'investigating' in text_lower:
-        return 'In Progress'
-    
-    if 'completed' in text_lower or 'resolved' in text_lower:
-        return 'Completed'
-    
-    if 'failed' in text_lower or 'fail' in text_lower:
-        return 'Failed'
-    
-    if 'passed' in text_lower or 'pass' in text_lower:
-        return 'Passed'
-    
-    if 'testing' in text_lower or 'test' in text_lower:
-        return 'Testing'
-    
-    if 'shipped' in text_lower or 'ship' in text_lower:
-        return 'Shipped'
-    
-    if 'returned' in text_lower or 'rma' in text_lower:
-        return 'Returned'
+    status = _match_status(_EN_STATUS_RE, _EN_STATUS_TABLE, text_lower)
+    if status == 'Closed' and ('known' in text_lower or 'issue' in text_lower):
+        return 'Closed - Known Issue'
+    if status:
+        return status
     
     # If text is short and clean, return first line
     first_line = text.split('\n')[0].strip()
@@ -728,6 +1079,663 @@ def extract_status_from_text(text: str) -> str:
     return first_line[:25].strip() + '...'
 
 
+# Date formats tried (in order) when bucketing dates by month
+DATE_FORMATS = [
+    '%Y-%m-%d',           # 2025-08-30
+    '%Y-%m-%d %H:%M:%S',  # 2025-08-30 02:54:00
+    '%m/%d/%Y',           # 08/30/2025
+    '%d/%m/%Y',           # 30/08/2025
+    '%Y/%m/%d',           # 2025/08/30
+    '%Y_%m',              # 2025_05
+    '%Y-%m',              # 2025-05
+]
+
+# Full dates only, for the Trace page's Month grouping
+MONTH_GROUP_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d']
+
+
+def parse_months(dates: pd.Series, year_month_fallback: bool = False,
+                 formats: List[str] = DATE_FORMATS) -> pd.Series:
+    """
+    Map date strings to 'YYYY-MM' (NaN where unparseable). Each format is tried as one
+    vectorized pass over the still-unparsed values; "a | b" values use the first date.
+    With year_month_fallback, a YYYY-MM / YYYY_MM pattern anywhere in the text is used last.
+    """
+    date_str = dates.where(~dates.isin(['', 'N/A'])).dropna().astype(str)
+    date_str = date_str.str.split(' | ', regex=False).str[0].str.strip()
+    
+    parsed = pd.Series(pd.NaT, index=date_str.index, dtype='datetime64[ns]')
+    for fmt in formats:
+        missing = parsed.isna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(date_str[missing], format=fmt, errors='coerce')
+    
+    months = parsed.dt.strftime('%Y-%m')
+    if year_month_fallback:
+        year_month = date_str.str.extract(r'(\d{4})[-_](\d{2})')
+        months = months.fillna(year_month[0] + '-' + year_month[1])
+    return months.reindex(dates.index)
+
+
+def _first_customer(frame: pd.DataFrame, cols) -> pd.Series:
+    """
+    Row-wise first usable customer name across ``cols`` (in order): stripped and
+    upper-cased, skipping empty values and N/A / NA / NONE placeholders. NaN if none.
+    """
+    cols = [col for col in cols if col in frame.columns]
+    if not cols:
+        return pd.Series(None, index=frame.index, dtype=object)
+    
+    def normalize(values: pd.Series) -> pd.Series:
+        # Customer names repeat heavily, so normalize each distinct value once and map back
+        raw = values[values.notna() & values.astype(bool)].astype(str)
+        uniques = pd.Series(raw.unique())
+        names = uniques.str.strip().str.upper()
+        names = names.where(~names.isin(['N/A', 'NA', 'NONE', '']))
+        return raw.map(dict(zip(uniques, names))).reindex(values.index)
+    
+    return frame[cols].apply(normalize).bfill(axis=1).iloc[:, 0]
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def compute_dashboard_metrics(version: str, _assets: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregate the Dashboard counters (with customer breakdowns) over all assets.
+    Cached on the fetched data's version so reruns reuse the counts instead of
+    re-walking every asset; the list itself is not hashed.
+    """
+    assets = _assets
+    
+    raw = [asset.get('raw_data') or {} for asset in assets]
+    frame = pd.DataFrame(raw, index=range(len(raw)))
+    
+    # Extract customer - use AI classification if available (v3.2+). Assets from one
+    # file share a classification, so resolve each distinct set of CUSTOMER columns once
+    customer = pd.Series(None, index=frame.index, dtype=object)
+    classified_groups: Dict[Tuple[str, ...], List[int]] = {}
+    for pos, raw_data in enumerate(raw):
+        classification = raw_data.get('_column_classification') or {}
+        cols = tuple(col for col, category in classification.items() if category == 'CUSTOMER')
+        if cols:
+            classified_groups.setdefault(cols, []).append(pos)
+    for cols, positions in classified_groups.items():
+        customer.iloc[positions] = _first_customer(frame.iloc[positions], cols).values
+    
+    # Then the standard "Customer" field (added by parser), then keyword-matched columns
+    # for older data without classification
+    keyword_cols = [col for col in frame.columns
+                    if not col.startswith('_') and CUSTOMER_KEY_RE.match(col.lower())]
+    customer = customer.fillna(_first_customer(frame, ['Customer']))
+    customer = customer.fillna(_first_customer(frame, keyword_cols)).fillna('Unknown')
+    customer_counts = Counter(customer.value_counts().to_dict())
+    
+    # Per-asset key columns; counted vectorized below
+    rows = [
+        (customer_name, key_cols.get('Error'), key_cols.get('Status'), key_cols.get('Date'))
+        for customer_name, key_cols in zip(customer, (asset['_key_cols'] for asset in assets))
+    ]
+    
+    df = pd.DataFrame(rows, columns=['customer', 'error', 'status', 'date'])
+    
+    df['month'] = parse_months(df['date'], year_month_fallback=True)
+    
+    def breakdown(column: str) -> Tuple[Counter, Dict[str, Counter]]:
+        """Counts of a column's values and, per value, counts by customer"""
+        valid = df[df[column].notna() & ~df[column].isin(['', 'N/A'])]
+        counts = Counter(valid[column].value_counts().to_dict())
+        by_customer = {
+            value: Counter(group.value_counts().to_dict())
+            for value, group in valid.groupby(column, sort=False)['customer']
+        }
+        return counts, by_customer
+    
+    error_counts, error_by_customer = breakdown('error')  # {error_type: {customer: count}}
+    status_counts, status_by_customer = breakdown('status')  # {status: {customer: count}}
+    month_counts, month_by_customer = breakdown('month')  # {month: {customer: count}}
+    
+    return {
+        'total': len(assets),
+        'error_counts': error_counts,
+        'status_counts': status_counts,
+        'customer_counts': customer_counts,
+        'month_counts': month_counts,
+        'error_by_customer': error_by_customer,
+        'status_by_customer': status_by_customer,
+        'month_by_customer': month_by_customer,
+    }
+
+
+def _group_by_error(assets: List[Dict[str, Any]]) -> pd.Series:
+    """Failure Type: the normalized error type"""
+    return pd.Series([asset['_key_cols']['Error'] for asset in assets], dtype=object)
+
+
+def _group_by_status(assets: List[Dict[str, Any]]) -> pd.Series:
+    """Status: the extracted status"""
+    return pd.Series([asset['_key_cols']['Status'] for asset in assets], dtype=object)
+
+
+def _group_by_month(assets: List[Dict[str, Any]]) -> pd.Series:
+    """Month: YYYY-MM from the date's first token, 'Unknown' when unparseable"""
+    dates = pd.Series([asset['_key_cols']['Date'] for asset in assets], dtype=object)
+    return parse_months(dates.str.split().str[0], formats=MONTH_GROUP_FORMATS).fillna('Unknown')
+
+
+def _group_by_customer(assets: List[Dict[str, Any]]) -> pd.Series:
+    """Customer: intelligently extracted from raw_data, column by column"""
+    frame = pd.DataFrame([asset.get('raw_data') or {} for asset in assets], index=range(len(assets)))
+    customer_cols = [col for col in frame.columns
+                     if not col.startswith('_') and CUSTOMER_SUBSTR_RE.search(col.lower())]
+    return _first_customer(frame, customer_cols).fillna('Unknown')
+
+
+def _group_by_tier(assets: List[Dict[str, Any]]) -> pd.Series:
+    """Tier Analysis: the first failing tier in test-flow order, or the pass/not-run bucket"""
+    import logging
+    logger = logging.getLogger(__name__)
+    
+    group_keys = []
+    for asset in assets:
+        key_cols = asset['_key_cols']
+        raw_data = asset.get('raw_data', {})
+        
+        # Detect tier columns and analyze test flow progression
+        # Look for tier-related columns: L1, L2, ATE, SLT, Tier0-5, etc.
+        tier_columns = []
+        tier_keywords = ['l1', 'l2', 'slt', 'ceslt', 'osv', 'afhc', 'tier0', 'tier1', 'tier2',
+                       'tier3', 'tier4', 'tier5', 'tier 0', 'tier 1', 'tier 2', 'tier 3', 'tier 4', 'tier 5',
+                       'ft1', 'ft2', 'fs1', 'fs2', 'diag', 'aft', 'wl:', 'hdrt', 'difect', 
+                       'per core', 'charz', 'shak', 'kvm']
+        
+        serial = key_cols.get('Serial Number', 'Unknown')
+        logger.info(f"\n--- Processing Asset: {serial} ---")
+        
+        for key in raw_data.keys():
+            if not key.startswith('_'):
+                key_lower = key.lower().strip()
+                
+                # Explicitly exclude date/time/mfg columns
+                if any(x in key_lower for x in ['date', 'timestamp', 'time', 'mfg', 'wafer', 'ship', 'receive']):
+                    logger.debug(f"  Skipping date column: {key}")
+                    continue  # Skip all date/time/manufacturing date columns
+                
+                # Exclude status/result columns (not actual test tiers)
+                if any(x in key_lower for x in ['status', 'result', 'plan', 'comment', 'debug', 'repro status']):
+                    logger.debug(f"  Skipping status column: {key}")
+                    continue
+                
+                # Check if this is a tier column using flexible matching
+                is_tier = False
+                for kw in tier_keywords:
+                    if kw in key_lower:
+                        is_tier = True
+                        logger.debug(f"  Tier column detected (keyword '{kw}'): {key}")
+                        break
+                
+                # Special handling for 'ate' - must be word boundary to avoid matching 'date'
+                if not is_tier and ('ate' in key_lower or ' ate ' in key_lower or key_lower.startswith('ate ') or key_lower.endswith(' ate') or key_lower == 'ate'):
+                    # Make sure it's not part of 'date', 'update', 'create', etc.
+                    if 'date' not in key_lower and 'update' not in key_lower and 'create' not in key_lower:
+                        is_tier = True
+                        logger.debug(f"  Tier column detected (ATE match): {key}")
+                
+                if is_tier:
+                    tier_value = raw_data.get(key)
+                    tier_columns.append((key, tier_value))
+                    logger.info(f"  {key}: '{tier_value}'")
+        
+        logger.info(f"  Total tier columns found: {len(tier_columns)}")
+        
+        # Define pass/not-run values with smarter matching
+        def is_pass_value(val):
+            """Check if a value indicates a passing test - ONLY explicit PASS/NFF/NFT without '?'"""
+            if not val:
+                return False
+            val_str = str(val).strip().upper()
+            
+            # If value ends with "?", it's NOT a definitive pass (uncertain = failure)
+            if val_str.endswith('?'):
+                return False
+            
+            # Pass ONLY if it's exactly NFF/NFT (with optional hrs in parens) or PASS/PASSED
+            # Must start with these exact prefixes
+            if val_str.startswith('NFF') or val_str.startswith('NFT'):
+                # Additional check: shouldn't contain failure keywords
+                val_lower = val_str.lower()
+                if any(fail_word in val_lower for fail_word in ['fail', 'hang', 'error', 'crash']):
+                    return False
+                return True
+            return val_str in ['PASS', 'PASSED']
+        
+        def is_not_run(val):
+            """Check if a value indicates test was not run - ONLY explicit NOT RUN/N/A"""
+            if not val or str(val).strip() == '':
+                return True
+            val_str = str(val).strip().upper()
+            
+            # Values with "?" are NOT "not run" - they are uncertain failures
+            # Only explicit NOT RUN, N/A, NA count as not run
+            return val_str in ['N/A', 'NA'] or 'NOT RUN' in val_str or 'NOTRUN' in val_str
+        
+        def is_failure(val):
+            """Check if a value indicates a test failure - anything except explicit PASS or NOT RUN"""
+            if is_not_run(val):
+                return False
+            if is_pass_value(val):
+                return False
+            # If it has content and it's not pass/not-run, it's a failure
+            # This includes "Fail?", "NFF?", and any other uncertain or error values
+            val_str = str(val).strip()
+            return len(val_str) > 0
+        
+        # Sort tier columns by their tier level for proper progression analysis
+        # Tier order: tier0/l1/l2 -> tier1/ate ft -> tier2/slt -> tier3/fs1 -> tier4/diag -> tier5/fs2/wl
+        def get_tier_order(col_name):
+            import re
+            col_lower = col_name.lower()
+            
+            # Handle multi-part column names from merged headers: "Tier# - Group - Test"
+            # Extract the tier number if present
+            tier_match = re.search(r'tier\s*(\d+)', col_lower)
+            if tier_match:
+                tier_num = int(tier_match.group(1))
+                return (tier_num, col_name)
+            
+            # Assign order priority - check for exact matches and substrings
+            
+            # Tier 0: Basic tests (L1, L2, ATE, SLT, CESLT, OSV, AFHC at Suzhou)
+            # These are standalone simple names under Tier0-Suzhou header
+            if (col_lower in ['l1', 'l2', 'ate', 'slt', 'ceslt', 'osv'] or 
+                'afhc at suzhou' in col_lower or 'suzhou' in col_lower):
+                return (0, col_name)
+            
+            # Tier 1: ATE detailed tests (ATE FT1, ATE FT2, Per Core Charz)
+            elif any(x in col_lower for x in ['ate ft', 'ft1', 'ft2', 'per core', 'core char']):
+                return (1, col_name)
+            
+            # Tier 2: SLT tests (SLT1, SLT2, SLT perCCD)
+            elif any(x in col_lower for x in ['slt1', 'slt2', 'slt per', 'perccd']):
+                return (2, col_name)
+            
+            # Tier 3: FS1 tests
+            elif any(x in col_lower for x in ['fs1', 'l3 repro', 'afhc det', 'repro']):
+                return (3, col_name)
+            
+            # Tier 4: Diag tests
+            elif any(x in col_lower for x in ['diag', 'extended diag', 'shak', 'kvm']):
+                return (4, col_name)
+            
+            # Tier 5: FS2 / WL tests
+            elif any(x in col_lower for x in ['fs2', 'wl:', 'wl ', 'variable fan', 'freq exp', 'voltage exp', 'v + freq', 'nominal']):
+                return (5, col_name)
+            
+            else:
+                # Unknown tier
+                return (99, col_name)
+        
+        # Sort tier columns by logical progression
+        tier_columns_sorted = sorted(tier_columns, key=lambda x: get_tier_order(x[0]))
+        
+        logger.info(f"  Analyzing tier results in progression order:")
+        
+        # Analyze test results across all tiers
+        has_any_failure = False
+        has_any_pass = False
+        has_any_not_run = False
+        all_not_run = True
+        
+        for tier_col, tier_value in tier_columns_sorted:
+            tier_order = get_tier_order(tier_col)[0]
+            
+            is_fail = is_failure(tier_value)
+            is_pass = is_pass_value(tier_value)
+            is_not = is_not_run(tier_value)
+            
+            logger.info(f"    [Tier{tier_order}] {tier_col}: '{tier_value}' → is_fail={is_fail}, is_pass={is_pass}, is_not_run={is_not}")
+            
+            if is_fail:
+                has_any_failure = True
+                all_not_run = False
+            elif is_pass:
+                has_any_pass = True
+                all_not_run = False
+            elif is_not:
+                has_any_not_run = True
+        
+        logger.info(f"  Summary: has_any_pass={has_any_pass}, has_any_failure={has_any_failure}, has_any_not_run={has_any_not_run}, all_not_run={all_not_run}")
+        
+        # Find the first failing tier in progression order
+        first_fail_tier = None
+        first_fail_value = None
+        first_fail_tier_num = None
+        if has_any_failure:
+            for tier_col, tier_value in tier_columns_sorted:
+                if is_failure(tier_value):
+                    first_fail_tier = tier_col
+                    first_fail_value = tier_value
+                    first_fail_tier_num = get_tier_order(tier_col)[0]
+                    logger.info(f"  First failure detected at: {tier_col} (value: '{tier_value}', tier_num: {first_fail_tier_num})")
+                    break
+        
+        # Determine grouping
+        logger.info(f"  Determining group assignment:")
+        if not tier_columns:
+            group_key = "❓ No Tier Data"
+            logger.info(f"  → Decision: No tier columns found")
+            logger.info(f"  → Group: {group_key}")
+        elif all_not_run:
+            group_key = "⏸️ Not Run - No Test Results"
+            logger.info(f"  → Decision: All tests are 'Not run'")
+            logger.info(f"  → Group: {group_key}")
+        elif first_fail_tier:
+            # Extract clean tier name and append failure type
+            tier_clean = extract_tier_name(first_fail_tier)
+            # Shorten failure value for grouping (max 30 chars)
+            fail_short = str(first_fail_value)[:30] if first_fail_value else 'Unknown'
+            
+            # If tier number is 99 (unknown tier), group as "No Tier Data" instead of "Tier99"
+            if first_fail_tier_num == 99:
+                group_key = f"❓ No Tier Data - {tier_clean}: {fail_short}"
+            else:
+                group_key = f"❌ Tier{first_fail_tier_num} {tier_clean}: {fail_short}"
+            
+            logger.info(f"  → Decision: Has failure at first failing tier")
+            logger.info(f"  → Group: {group_key}")
+        elif has_any_pass and not has_any_failure and not has_any_not_run:
+            # All Tiers Passed: ALL tiers must be explicitly PASS (no failures, no not-run)
+            group_key = "✅ All Tiers Passed"
+            logger.info(f"  → Decision: All tiers have explicit PASS results")
+            logger.info(f"  → Group: {group_key}")
+        elif has_any_pass and not has_any_failure and has_any_not_run:
+            # Has some passes and some not-run (no failures) - treat as Not Run
+            group_key = "⏸️ Not Run - No Test Results"
+            logger.info(f"  → Decision: Has passes but also has 'Not run' tiers")
+            logger.info(f"  → Group: {group_key}")
+        else:
+            group_key = "❓ No Tier Data"
+            logger.info(f"  → Decision: Edge case - no clear pass/fail pattern")
+            logger.info(f"  → Group: {group_key} (has_pass={has_any_pass}, has_fail={has_any_failure}, has_not_run={has_any_not_run})")
+        
+        group_keys.append(group_key)
+    return pd.Series(group_keys, dtype=object)
+
+
+# Analytics "Group By" options -> per-asset group key Series
+GROUPERS: Dict[str, Callable[[List[Dict[str, Any]]], pd.Series]] = {
+    "Failure Type": _group_by_error,
+    "Month": _group_by_month,
+    "Status": _group_by_status,
+    "Customer": _group_by_customer,
+    "Tier Analysis": _group_by_tier,
+}
+
+
+# Define color palette for customers
+CUSTOMER_COLORS = {
+    'ALIBABA': '#ff6b6b',
+    'TENCENT': '#51cf66',
+    'TURIN': '#339af0',
+    'META': '#cc5de8',
+    'GOOGLE': '#ffd43b',
+    'MICROSOFT': '#ff8787',
+    'AMAZON': '#ffa94d',
+    'FACEBOOK': '#74c0fc',
+    'BYTEDANCE': '#b197fc',
+    'BAIDU': '#ffc9c9',
+    'HUAWEI': '#a9e34b',
+    'INTEL': '#66d9e8',
+    'AMD': '#ff8787',
+    'Unknown': '#6c757d'
+}
+
+
+def stacked_rows(items: List[Tuple[str, int]], by_customer: Dict[str, Counter]) -> Tuple:
+    """
+    Freeze (label, total) pairs and their per-customer counts into a tuple
+    consumed by the Dashboard chart builders.
+    """
+    return tuple(
+        (label, total, tuple(sorted(by_customer.get(label, {}).items())))
+        for label, total in items
+    )
+
+
+def _stack_by_customer(rows: Tuple) -> Tuple[List[str], List[Tuple[str, List[int]]]]:
+    """Labels plus, per customer (sorted), its count for each label"""
+    labels = [row[0] for row in rows]
+    breakdowns = [dict(row[2]) for row in rows]
+    all_customers = sorted({customer for breakdown in breakdowns for customer in breakdown})
+    return labels, [(customer, [b.get(customer, 0) for b in breakdowns]) for customer in all_customers]
+
+
+def _dark_theme(chart):
+    """Apply the dark Dashboard palette to an Altair chart"""
+    return (
+        chart
+        .properties(height=400, background='#1a1a2e')
+        .configure_view(fill='#16213e', stroke='#3a4a5c')
+        .configure_axis(labelColor='#ffffff', titleColor='#ffffff', labelFontSize=10,
+                        titleFontSize=12, gridColor='#ffffff', gridOpacity=0.2,
+                        gridDash=[4, 4], domainColor='#3a4a5c', tickColor='#3a4a5c')
+        .configure_title(color='#ffffff', fontSize=14, fontWeight='bold')
+        .configure_legend(labelColor='#ffffff', titleColor='#ffffff', fillColor='#16213e',
+                          strokeColor='#3a4a5c', padding=6)
+    )
+
+
+def _stacked_frames(rows: Tuple) -> Tuple[pd.DataFrame, pd.DataFrame, List[str]]:
+    """Long-form (label, Customer, Count) rows, per-label totals and the label order"""
+    labels, stacks = _stack_by_customer(rows)
+    long_df = pd.DataFrame(
+        [(label, customer, value)
+         for customer, values in stacks
+         for label, value in zip(labels, values)],
+        columns=['label', 'Customer', 'Count']
+    )
+    totals_df = pd.DataFrame(
+        [(label, total) for label, total, _ in rows], columns=['label', 'Total']
+    )
+    return long_df, totals_df, labels
+
+
+def _customer_scale(customers):
+    """Altair color scale pinning each customer to its CUSTOMER_COLORS entry"""
+    import altair as alt
+    
+    domain = sorted(set(customers))
+    return alt.Scale(domain=domain, range=[CUSTOMER_COLORS.get(c, '#95a5a6') for c in domain])
+
+
+def make_error_chart(rows: Tuple):
+    """Stacked horizontal bars of the top failure types by customer"""
+    import altair as alt
+    
+    long_df, totals_df, labels = _stacked_frames(rows)
+    y = alt.Y('label:N', sort=labels, title=None)
+    
+    bars = alt.Chart(long_df).mark_bar(stroke='white', strokeWidth=0.3).encode(
+        y=y,
+        x=alt.X('sum(Count):Q', title='Count'),
+        color=alt.Color('Customer:N', scale=_customer_scale(long_df['Customer'])),
+        tooltip=['label', 'Customer', 'Count']
+    )
+    totals = alt.Chart(totals_df).mark_text(
+        align='left', dx=4, color='#ffffff', fontWeight='bold', fontSize=11
+    ).encode(y=y, x='Total:Q', text='Total:Q')
+    
+    return _dark_theme((bars + totals).properties(title='Top 10 Failure Types by Customer'))
+
+
+def make_month_chart(rows: Tuple):
+    """Stacked area of assets per month by customer"""
+    import altair as alt
+    
+    long_df, totals_df, labels = _stacked_frames(rows)
+    x = alt.X('label:O', sort=labels, title=None, axis=alt.Axis(labelAngle=-45))
+    
+    area = alt.Chart(long_df).mark_area(opacity=0.8, stroke='white', strokeWidth=0.5).encode(
+        x=x,
+        y=alt.Y('sum(Count):Q', title='Count'),
+        color=alt.Color('Customer:N', scale=_customer_scale(long_df['Customer'])),
+        tooltip=['label', 'Customer', 'Count']
+    )
+    totals = alt.Chart(totals_df).mark_text(
+        baseline='bottom', dy=-4, color='#ffffff', fontWeight='bold', fontSize=10
+    ).encode(x=x, y='Total:Q', text='Total:Q')
+    
+    return _dark_theme((area + totals).properties(title='Asset Trend Over Time by Customer'))
+
+
+def make_status_chart(rows: Tuple):
+    """Stacked vertical bars of the top statuses by customer"""
+    import altair as alt
+    
+    long_df, totals_df, labels = _stacked_frames(rows)
+    x = alt.X('label:N', sort=labels, title=None, axis=alt.Axis(labelAngle=-45, labelFontWeight='bold'))
+    
+    bars = alt.Chart(long_df).mark_bar(stroke='white', strokeWidth=0.3).encode(
+        x=x,
+        y=alt.Y('sum(Count):Q', title='Total Assets'),
+        color=alt.Color('Customer:N', scale=_customer_scale(long_df['Customer'])),
+        tooltip=['label', 'Customer', 'Count']
+    )
+    totals = alt.Chart(totals_df).mark_text(
+        baseline='bottom', dy=-2, color='#ffffff', fontWeight='bold', fontSize=10
+    ).encode(x=x, y='Total:Q', text='Total:Q')
+    
+    return _dark_theme((bars + totals).properties(title='Assets by Status by Customer'))
+
+
+def make_customer_chart(items: Tuple[Tuple[str, int], ...]):
+    """Horizontal bars of the top customers"""
+    # Gradient colors from purple to pink, in rank order
+    colors = ['#845ef7', '#9775fa', '#b197fc', '#cc99ff', '#d5a5ff',
+             '#deb3ff', '#e7c1ff', '#f0cfff', '#f9ddff', '#ffe0ff']
+    return make_ranked_bar_chart(items, 'Top 10 Customers', colors)
+
+
+def make_ranked_bar_chart(items, title: str, colors: List[str], horizontal: bool = True):
+    """
+    Bars for (label, count) pairs in the given order, with count labels.
+    Each bar takes the next color from ``colors`` (cycled), like Matplotlib's bar colors.
+    """
+    import altair as alt
+    
+    df = pd.DataFrame(list(items), columns=['label', 'Count'])
+    labels = df['label'].tolist()
+    
+    if horizontal:
+        position = {'y': alt.Y('label:N', sort=labels, title=None), 'x': alt.X('Count:Q', title='Count')}
+        text_style = {'align': 'left', 'dx': 4, 'fontSize': 11}
+    else:
+        position = {'x': alt.X('label:N', sort=labels, title=None,
+                               axis=alt.Axis(labelAngle=-45, labelFontWeight='bold')),
+                    'y': alt.Y('Count:Q', title='Count')}
+        text_style = {'baseline': 'bottom', 'dy': -2, 'fontSize': 10}
+    
+    bars = alt.Chart(df).mark_bar(stroke='white', strokeWidth=0.5).encode(
+        color=alt.Color('label:N', legend=None, scale=alt.Scale(
+            domain=labels, range=[colors[i % len(colors)] for i in range(len(labels))])),
+        tooltip=['label', 'Count'],
+        **position
+    )
+    counts = alt.Chart(df).mark_text(color='#ffffff', fontWeight='bold', **text_style).encode(
+        text='Count:Q', **position
+    )
+    
+    return _dark_theme((bars + counts).properties(title=title))
+
+
+def make_trend_chart(items, title: str, color: str = '#51cf66'):
+    """Line with markers and a shaded area for (month, count) pairs in the given order"""
+    import altair as alt
+    
+    df = pd.DataFrame(list(items), columns=['Month', 'Count'])
+    base = alt.Chart(df).encode(
+        x=alt.X('Month:O', sort=df['Month'].tolist(), title=None, axis=alt.Axis(labelAngle=-45)),
+        y=alt.Y('Count:Q', title='Count')
+    )
+    
+    area = base.mark_area(color=color, opacity=0.3)
+    line = base.mark_line(color=color, strokeWidth=3, point=alt.OverlayMarkDef(
+        color=color, size=80, stroke='white', strokeWidth=2
+    )).encode(tooltip=['Month', 'Count'])
+    counts = base.mark_text(baseline='bottom', dy=-8, color='#ffffff', fontWeight='bold', fontSize=10).encode(
+        text='Count:Q'
+    )
+    
+    return _dark_theme((area + line + counts).properties(title=title))
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def make_owner_fig(items: Tuple[Tuple[str, int], ...]):
+    """Bar chart of failures per owner, cached so unrelated reruns reuse the figure"""
+    import matplotlib.pyplot as plt
+    
+    fig, ax = plt.subplots(figsize=(10, 6), facecolor='#1a1a2e')
+    ax.set_facecolor('#16213e')
+    
+    owners = [owner for owner, _ in items]
+    counts = [count for _, count in items]
+    colors = ['#ff6b6b', '#51cf66', '#339af0', '#ffd43b', '#cc5de8', '#ff8787', '#74c0fc']
+    
+    bars = ax.bar(owners, counts, color=colors[:len(owners)], edgecolor='white', linewidth=1)
+    ax.set_ylabel('Failure Count', color='#ffffff', fontsize=12, fontweight='bold')
+    ax.set_title('Failures by Owner/Status', color='#ffffff', fontsize=14, fontweight='bold', pad=15)
+    ax.grid(axis='y', alpha=0.2, color='white', linestyle='--')
+    ax.tick_params(colors='#ffffff')
+    
+    for spine in ax.spines.values():
+        spine.set_color('#3a4a5c')
+    
+    # Add value labels
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+               f'{int(height)}', ha='center', va='bottom',
+               fontsize=11, color='#ffffff', fontweight='bold')
+    
+    fig.tight_layout()
+    plt.close(fig)
+    return fig
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def make_platform_fig(platforms: Tuple[Tuple[str, Tuple[Tuple[str, int], ...]], ...], tier_names: Tuple[str, ...]):
+    """Grouped bars of tier failures per platform, cached like make_owner_fig"""
+    import matplotlib.pyplot as plt
+    
+    fig, ax = plt.subplots(figsize=(12, 6), facecolor='#1a1a2e')
+    ax.set_facecolor('#16213e')
+    
+    x = range(len(tier_names))
+    width = 0.8 / len(platforms)
+    colors = ['#ff6b6b', '#51cf66', '#339af0', '#ffd43b', '#cc5de8', '#ff8787']
+    
+    for i, (platform, tier_counts) in enumerate(platforms[:6]):  # Max 6 platforms
+        tier_counts = dict(tier_counts)
+        counts = [tier_counts.get(t, 0) for t in tier_names]
+        offset = width * i - (width * len(platforms) / 2)
+        ax.bar([p + offset for p in x], counts, width, label=platform[:15], 
+              color=colors[i % len(colors)])
+    
+    ax.set_xticks(x)
+    ax.set_xticklabels(tier_names, rotation=45, ha='right', color='#ffffff', fontsize=9)
+    ax.set_ylabel('Failure Count', color='#ffffff', fontsize=12, fontweight='bold')
+    ax.set_title('Failures by Platform and Tier', color='#ffffff', fontsize=14, fontweight='bold', pad=15)
+    ax.legend(loc='upper right', facecolor='#16213e', edgecolor='white', labelcolor='white', fontsize=9)
+    ax.grid(axis='y', alpha=0.2, color='white', linestyle='--')
+    ax.tick_params(colors='#ffffff')
+    
+    for spine in ax.spines.values():
+        spine.set_color('#3a4a5c')
+    
+    fig.tight_layout()
+    plt.close(fig)
+    return fig
+
+
 # Initialize session state
 if 'page' not in st.session_state:
     st.session_state.page = "Dashboard"
@@ -795,162 +1803,21 @@ if st.session_state.page == "Dashboard":
     # ==================== DASHBOARD PAGE ====================
     st.markdown("## 📊 Dashboard Overview")
     
-    # Get all assets for dashboard metrics
+    # Aggregated metrics over all assets (cached across reruns)
     data = get_assets_filtered(source_files=None)
-    
+    metrics = None
     if data and data.get('total', 0) > 0:
-        assets = data['assets']
-        
-        # Extract metrics with customer segmentation
-        error_counts = Counter()
-        status_counts = Counter()
-        customer_counts = Counter()
-        date_months = []
-        
-        # New: Track customer breakdown for each metric
-        error_by_customer = {}  # {error_type: {customer: count}}
-        status_by_customer = {}  # {status: {customer: count}}
-        month_by_customer = {}  # {month: {customer: count}}
-        
-        for asset in assets:
-            key_cols = get_key_columns(asset)
-            raw_data = asset.get('raw_data', {})
-            
-            # Extract customer - use AI classification if available
-            customer_found = False
-            customer_name = 'Unknown'
-            
-            # First, check if we have column classification metadata (v3.2+)
-            column_classification = raw_data.get('_column_classification', {})
-            
-            # Debug logging for first 5 assets
-            if len(customer_counts) < 5:
-                print(f"\n🔍 DEBUG Asset {asset.get('serial_number', 'unknown')}:")
-                print(f"  Has classification: {bool(column_classification)}")
-                if column_classification:
-                    customer_cols = [col for col, cat in column_classification.items() if cat == 'CUSTOMER']
-                    print(f"  Customer columns from classification: {customer_cols}")
-            
-            # If we have classification data, use it
-            if column_classification:
-                for col, category in column_classification.items():
-                    if category == 'CUSTOMER' and col in raw_data:
-                        value = raw_data.get(col)
-                        if value:
-                            customer_name = str(value).strip().upper()
-                            
-                            # Debug log
-                            if len(customer_counts) < 5:
-                                print(f"  Using classified CUSTOMER column: '{col}' = '{customer_name}'")
-                            
-                            if customer_name and customer_name not in ['N/A', 'NA', 'NONE', '']:
-                                customer_counts[customer_name] += 1
-                                customer_found = True
-                                break
-            
-            # If not found via classification, check for standard "Customer" field (added by parser)
-            if not customer_found and 'Customer' in raw_data:
-                value = raw_data.get('Customer')
-                if value:
-                    customer_name = str(value).strip().upper()
-                    
-                    if len(customer_counts) < 5:
-                        print(f"  Using standard 'Customer' field: '{customer_name}'")
-                    
-                    if customer_name and customer_name not in ['N/A', 'NA', 'NONE', '']:
-                        customer_counts[customer_name] += 1
-                        customer_found = True
-            
-            # Last fallback: keyword search for older data without classification
-            if not customer_found:
-                customer_keywords = ['customer', 'client', 'end_customer', 'end customer', 
-                                   'customer_name', 'customer name', '客户']
-                
-                for key, value in raw_data.items():
-                    if not key.startswith('_') and value:
-                        # Exact match or starts with keyword (avoid false positives)
-                        if any(key.lower() == kw or key.lower().startswith(kw + ' ') or key.lower().startswith(kw + '_') 
-                               for kw in customer_keywords):
-                            customer_name = str(value).strip().upper()
-                            
-                            if len(customer_counts) < 5:
-                                print(f"  Using keyword-matched customer column: '{key}' = '{customer_name}'")
-                            
-                            if customer_name and customer_name not in ['N/A', 'NA', 'NONE', '']:
-                                customer_counts[customer_name] += 1
-                                customer_found = True
-                                break
-            
-            if not customer_found:
-                customer_counts['Unknown'] += 1
-                customer_name = 'Unknown'
-            
-            # Count errors with customer breakdown
-            error_type = key_cols.get('Error', 'Unknown')
-            if error_type and error_type != 'N/A':
-                error_counts[error_type] += 1
-                if error_type not in error_by_customer:
-                    error_by_customer[error_type] = Counter()
-                error_by_customer[error_type][customer_name] += 1
-            
-            # Count status with customer breakdown
-            status = key_cols.get('Status', 'Unknown')
-            if status and status != 'N/A':
-                status_counts[status] += 1
-                if status not in status_by_customer:
-                    status_by_customer[status] = Counter()
-                status_by_customer[status][customer_name] += 1
-            
-            # Extract month with improved date parsing
-            date_str = key_cols.get('Date', '')
-            
-            if date_str and date_str != 'N/A':
-                try:
-                    # Handle concatenated dates (take first one before " | ")
-                    if ' | ' in str(date_str):
-                        date_str = str(date_str).split(' | ')[0].strip()
-                    
-                    # Try various date formats
-                    date_formats = [
-                        '%Y-%m-%d',           # 2025-08-30
-                        '%Y-%m-%d %H:%M:%S',  # 2025-08-30 02:54:00
-                        '%m/%d/%Y',           # 08/30/2025
-                        '%d/%m/%Y',           # 30/08/2025
-                        '%Y/%m/%d',           # 2025/08/30
-                        '%Y_%m',              # 2025_05
-                        '%Y-%m',              # 2025-05
-                    ]
-                    
-                    parsed = False
-                    month_str = None
-                    for fmt in date_formats:
-                        try:
-                            date_obj = datetime.strptime(str(date_str).strip(), fmt)
-                            month_str = date_obj.strftime('%Y-%m')
-                            date_months.append(month_str)
-                            parsed = True
-                            break
-                        except:
-                            continue
-                    
-                    # If still not parsed, try extracting YYYY-MM or YYYY_MM pattern
-                    if not parsed:
-                        import re
-                        match = re.search(r'(\d{4})[-_](\d{2})', str(date_str))
-                        if match:
-                            month_str = f"{match.group(1)}-{match.group(2)}"
-                            date_months.append(month_str)
-                            parsed = True
-                    
-                    # Track customer for this month
-                    if parsed and month_str:
-                        if month_str not in month_by_customer:
-                            month_by_customer[month_str] = Counter()
-                        month_by_customer[month_str][customer_name] += 1
-                except Exception as e:
-                    pass
-        
-        month_counts = Counter(date_months)
+        metrics = compute_dashboard_metrics(data['version'], data['assets'])
+    
+    if metrics:
+        total_assets = metrics['total']
+        error_counts = metrics['error_counts']
+        status_counts = metrics['status_counts']
+        customer_counts = metrics['customer_counts']
+        month_counts = metrics['month_counts']
+        error_by_customer = metrics['error_by_customer']
+        status_by_customer = metrics['status_by_customer']
+        month_by_customer = metrics['month_by_customer']
         
         # Display Key Metrics
         st.markdown("### Key Metrics")
@@ -959,8 +1826,8 @@ if st.session_state.page == "Dashboard":
         with col1:
             st.metric(
                 label="📦 Total Assets",
-                value=f"{len(assets):,}",
-                delta=f"+{len(assets) % 100}" if len(assets) > 0 else None
+                value=f"{total_assets:,}",
+                delta=f"+{total_assets % 100}" if total_assets > 0 else None
             )
         
         with col2:
@@ -994,79 +1861,8 @@ if st.session_state.page == "Dashboard":
         with col1:
             st.subheader("📊 Failures by Failure Type")
             if error_counts:
-                top_errors = dict(error_counts.most_common(10))
-                
-                fig, ax = plt.subplots(figsize=(10, 6), facecolor='#1a1a2e')
-                ax.set_facecolor('#16213e')
-                
-                # Get all unique customers
-                all_customers = set()
-                for error in top_errors.keys():
-                    if error in error_by_customer:
-                        all_customers.update(error_by_customer[error].keys())
-                all_customers = sorted(list(all_customers))
-                
-                # Define color palette for customers
-                customer_colors = {
-                    'ALIBABA': '#ff6b6b',
-                    'TENCENT': '#51cf66',
-                    'TURIN': '#339af0',
-                    'META': '#cc5de8',
-                    'GOOGLE': '#ffd43b',
-                    'MICROSOFT': '#ff8787',
-                    'AMAZON': '#ffa94d',
-                    'FACEBOOK': '#74c0fc',
-                    'BYTEDANCE': '#b197fc',
-                    'BAIDU': '#ffc9c9',
-                    'HUAWEI': '#a9e34b',
-                    'INTEL': '#66d9e8',
-                    'AMD': '#ff8787',
-                    'Unknown': '#6c757d'
-                }
-                
-                # Prepare data for stacked bars
-                error_names = list(top_errors.keys())
-                y_pos = range(len(error_names))
-                
-                # Create stacked bars
-                left_offset = [0] * len(error_names)
-                
-                for customer in all_customers:
-                    customer_values = []
-                    for error in error_names:
-                        count = error_by_customer.get(error, {}).get(customer, 0)
-                        customer_values.append(count)
-                    
-                    color = customer_colors.get(customer, '#95a5a6')
-                    ax.barh(y_pos, customer_values, left=left_offset, 
-                           label=customer, color=color, edgecolor='white', linewidth=0.3)
-                    
-                    # Update left offset for next stack
-                    left_offset = [left_offset[i] + customer_values[i] for i in range(len(error_names))]
-                
-                ax.set_yticks(y_pos)
-                ax.set_yticklabels(error_names)
-                ax.set_xlabel('Count', color='#ffffff', fontsize=12, fontweight='bold')
-                ax.set_title('Top 10 Failure Types by Customer', color='#ffffff', fontsize=14, fontweight='bold', pad=15)
-                ax.grid(axis='x', alpha=0.2, color='white', linestyle='--')
-                ax.tick_params(colors='#ffffff', labelsize=10)
-                
-                for spine in ax.spines.values():
-                    spine.set_color('#3a4a5c')
-                
-                # Add total count labels at end of bars
-                for i, (error, total) in enumerate(top_errors.items()):
-                    ax.text(total + 0.5, i, f'{int(total)}', 
-                           ha='left', va='center', fontsize=11, 
-                           color='#ffffff', fontweight='bold')
-                
-                # Add legend
-                ax.legend(loc='lower right', facecolor='#16213e', edgecolor='#3a4a5c',
-                         labelcolor='#ffffff', fontsize=9, ncol=2)
-                
-                plt.tight_layout()
-                st.pyplot(fig)
-                plt.close()
+                top_errors = error_counts.most_common(10)
+                st.altair_chart(make_error_chart(stacked_rows(top_errors, error_by_customer)), use_container_width=True, theme=None)
             else:
                 st.info("No error data available")
         
@@ -1074,79 +1870,8 @@ if st.session_state.page == "Dashboard":
         with col2:
             st.subheader("📅 Assets by Month")
             if month_counts:
-                sorted_months = dict(sorted(month_counts.items()))
-                
-                fig, ax = plt.subplots(figsize=(10, 6), facecolor='#1a1a2e')
-                ax.set_facecolor('#16213e')
-                
-                # Get all unique customers
-                all_customers = set()
-                for month in sorted_months.keys():
-                    if month in month_by_customer:
-                        all_customers.update(month_by_customer[month].keys())
-                all_customers = sorted(list(all_customers))
-                
-                # Define color palette for customers (same as above)
-                customer_colors = {
-                    'ALIBABA': '#ff6b6b',
-                    'TENCENT': '#51cf66',
-                    'TURIN': '#339af0',
-                    'META': '#cc5de8',
-                    'GOOGLE': '#ffd43b',
-                    'MICROSOFT': '#ff8787',
-                    'AMAZON': '#ffa94d',
-                    'FACEBOOK': '#74c0fc',
-                    'BYTEDANCE': '#b197fc',
-                    'BAIDU': '#ffc9c9',
-                    'HUAWEI': '#a9e34b',
-                    'INTEL': '#66d9e8',
-                    'AMD': '#ff8787',
-                    'Unknown': '#6c757d'
-                }
-                
-                # Prepare data for stacked area chart
-                months_list = list(sorted_months.keys())
-                x_pos = range(len(months_list))
-                
-                # Create stacked area chart
-                bottom = [0] * len(months_list)
-                
-                for customer in all_customers:
-                    customer_values = []
-                    for month in months_list:
-                        count = month_by_customer.get(month, {}).get(customer, 0)
-                        customer_values.append(count)
-                    
-                    color = customer_colors.get(customer, '#95a5a6')
-                    ax.fill_between(x_pos, bottom, 
-                                   [bottom[i] + customer_values[i] for i in range(len(months_list))],
-                                   label=customer, color=color, alpha=0.8, edgecolor='white', linewidth=0.5)
-                    
-                    # Update bottom for next stack
-                    bottom = [bottom[i] + customer_values[i] for i in range(len(months_list))]
-                
-                ax.set_xticks(x_pos)
-                ax.set_xticklabels(months_list, rotation=45, ha='right', color='#ffffff', fontsize=10)
-                ax.set_ylabel('Count', color='#ffffff', fontsize=12, fontweight='bold')
-                ax.set_title('Asset Trend Over Time by Customer', color='#ffffff', fontsize=14, fontweight='bold', pad=15)
-                ax.grid(axis='y', alpha=0.2, color='white', linestyle='--')
-                ax.tick_params(colors='#ffffff', labelsize=10)
-                
-                for spine in ax.spines.values():
-                    spine.set_color('#3a4a5c')
-                
-                # Add total value labels on top
-                for i, total in enumerate(bottom):
-                    ax.text(i, total + max(bottom)*0.02, f'{int(total)}', 
-                           ha='center', va='bottom', fontsize=10, color='#ffffff', fontweight='bold')
-                
-                # Add legend
-                ax.legend(loc='upper left', facecolor='#16213e', edgecolor='#3a4a5c',
-                         labelcolor='#ffffff', fontsize=9, ncol=2)
-                
-                plt.tight_layout()
-                st.pyplot(fig)
-                plt.close()
+                sorted_months = sorted(month_counts.items())
+                st.altair_chart(make_month_chart(stacked_rows(sorted_months, month_by_customer)), use_container_width=True, theme=None)
             else:
                 st.info("No date data available")
         
@@ -1157,81 +1882,8 @@ if st.session_state.page == "Dashboard":
         with col3:
             st.subheader("🔧 Assets by Status")
             if status_counts:
-                top_status = dict(status_counts.most_common(10))
-                
-                fig, ax = plt.subplots(figsize=(10, 6), facecolor='#1a1a2e')
-                ax.set_facecolor('#16213e')
-                
-                # Get all unique customers
-                all_customers = set()
-                for status in top_status.keys():
-                    if status in status_by_customer:
-                        all_customers.update(status_by_customer[status].keys())
-                all_customers = sorted(list(all_customers))
-                
-                # Define color palette for customers (same as above)
-                customer_colors = {
-                    'ALIBABA': '#ff6b6b',
-                    'TENCENT': '#51cf66',
-                    'TURIN': '#339af0',
-                    'META': '#cc5de8',
-                    'GOOGLE': '#ffd43b',
-                    'MICROSOFT': '#ff8787',
-                    'AMAZON': '#ffa94d',
-                    'FACEBOOK': '#74c0fc',
-                    'BYTEDANCE': '#b197fc',
-                    'BAIDU': '#ffc9c9',
-                    'HUAWEI': '#a9e34b',
-                    'INTEL': '#66d9e8',
-                    'AMD': '#ff8787',
-                    'Unknown': '#6c757d'
-                }
-                
-                # Prepare data for stacked bars
-                status_names = list(top_status.keys())
-                x_pos = range(len(status_names))
-                
-                # Create stacked bars
-                bottom_offset = [0] * len(status_names)
-                
-                for customer in all_customers:
-                    customer_values = []
-                    for status in status_names:
-                        count = status_by_customer.get(status, {}).get(customer, 0)
-                        customer_values.append(count)
-                    
-                    color = customer_colors.get(customer, '#95a5a6')
-                    ax.bar(x_pos, customer_values, bottom=bottom_offset,
-                          label=customer, color=color, edgecolor='white', linewidth=0.3, width=0.7)
-                    
-                    # Update bottom offset for next stack
-                    bottom_offset = [bottom_offset[i] + customer_values[i] for i in range(len(status_names))]
-                
-                ax.set_xticks(x_pos)
-                ax.set_xticklabels(status_names, rotation=45, ha='right', 
-                                  fontsize=10, fontweight='bold', color='#ffffff')
-                ax.set_ylabel('Total Assets', color='#ffffff', fontsize=12, fontweight='bold')
-                ax.set_title('Assets by Status by Customer', color='#ffffff', fontsize=14, fontweight='bold', pad=15)
-                ax.grid(axis='y', alpha=0.2, color='white', linestyle='--')
-                ax.tick_params(axis='x', colors='#ffffff', labelsize=10)
-                ax.tick_params(axis='y', colors='#ffffff', labelsize=10)
-                
-                for spine in ax.spines.values():
-                    spine.set_color('#3a4a5c')
-                
-                # Add total value labels on top of bars
-                for i, total in enumerate(bottom_offset):
-                    ax.text(i, total, f'{int(total)}', 
-                           ha='center', va='bottom', fontsize=10, 
-                           color='#ffffff', fontweight='bold')
-                
-                # Add legend
-                ax.legend(loc='upper right', facecolor='#16213e', edgecolor='#3a4a5c',
-                         labelcolor='#ffffff', fontsize=9, ncol=2)
-                
-                plt.tight_layout()
-                st.pyplot(fig)
-                plt.close()
+                top_status = status_counts.most_common(10)
+                st.altair_chart(make_status_chart(stacked_rows(top_status, status_by_customer)), use_container_width=True, theme=None)
             else:
                 st.info("No status data available")
         
@@ -1242,43 +1894,12 @@ if st.session_state.page == "Dashboard":
                 filtered_customers = {k: v for k, v in customer_counts.items() if k != 'Unknown'} if len(customer_counts) > 1 else customer_counts
                 
                 if filtered_customers:
-                    sorted_customers = sorted(filtered_customers.items(), key=lambda x: x[1], reverse=True)[:10]
-                    customers = [x[0] for x in sorted_customers]
-                    counts = [x[1] for x in sorted_customers]
-                    
-                    fig, ax = plt.subplots(figsize=(10, 6), facecolor='#1a1a2e')
-                    ax.set_facecolor('#16213e')
-                    
-                    # Create gradient colors from purple to pink
-                    colors = ['#845ef7', '#9775fa', '#b197fc', '#cc99ff', '#d5a5ff',
-                             '#deb3ff', '#e7c1ff', '#f0cfff', '#f9ddff', '#ffe0ff']
-                    
-                    bars = ax.barh(customers, counts, color=colors[:len(customers)], 
-                                  edgecolor='white', linewidth=0.5)
-                    ax.set_xlabel('Count', color='#ffffff', fontsize=12, fontweight='bold')
-                    ax.set_title('Top 10 Customers', color='#ffffff', fontsize=14, fontweight='bold', pad=15)
-                    ax.invert_yaxis()
-                    ax.grid(axis='x', alpha=0.2, color='white', linestyle='--')
-                    ax.tick_params(colors='#ffffff', labelsize=10)
-                    
-                    for spine in ax.spines.values():
-                        spine.set_color('#3a4a5c')
-                    
-                    for i, bar in enumerate(bars):
-                        width = bar.get_width()
-                        ax.text(width + 0.5, bar.get_y() + bar.get_height()/2., 
-                               f'{int(width)}',
-                               ha='left', va='center', fontsize=11, 
-                               color='#ffffff', fontweight='bold')
-                    
-                    plt.tight_layout()
-                    st.pyplot(fig)
-                    plt.close()
+                    sorted_customers = nlargest(10, filtered_customers.items(), key=itemgetter(1))
+                    st.altair_chart(make_customer_chart(tuple(sorted_customers)), use_container_width=True, theme=None)
                 else:
                     st.info("No customer data available")
             else:
                 st.info("No customer data available")
-    
     else:
         st.info("🎯 No assets in the database yet. Upload a file from the **Ingest Data** page to get started!")
 
@@ -1311,6 +1932,8 @@ elif st.session_state.page == "Ingest":
             progress_bar = st.progress(0)
             status_text = st.empty()
             
+            # One file at a time: the backend merges rows that share a serial number
+            # across files, and concurrent uploads would race on those upserts
             for idx, file in enumerate(uploaded_files):
                 status_text.text(f"Processing {file.name}...")
                 
@@ -1332,6 +1955,7 @@ elif st.session_state.page == "Ingest":
             
             # Display results
             if success_count > 0:
+                invalidate_data_caches()
                 st.success(f"✓ Successfully processed {success_count}/{len(uploaded_files)} file(s)")
                 
                 col1, col2, col3 = st.columns(3)
@@ -1361,92 +1985,99 @@ elif st.session_state.page == "Ingest":
     """)
     
     # File Management Section
-    st.markdown("---")
-    st.markdown("## 📂 File Management")
-    
-    source_files_data = get_source_files()
-    
-    if source_files_data and len(source_files_data) > 0:
-        st.markdown("**Source Files**")
-        
-        # Create DataFrame for source files
-        files_df = pd.DataFrame([
-            {
-                "Select": False,
-                "Filename": sf['filename'],
-                "Assets": sf['asset_count'],
-                "Last Updated": sf.get('last_updated', 'N/A')[:19] if sf.get('last_updated') else 'N/A'
-            }
-            for sf in source_files_data
-        ])
-        
-        # Display editable dataframe with checkboxes
-        edited_df = st.data_editor(
-            files_df,
-            hide_index=True,
-            use_container_width=True,
-            column_config={
-                "Select": st.column_config.CheckboxColumn(
-                    "Select",
-                    help="Select files to delete",
-                    default=False,
-                ),
-                "Filename": st.column_config.TextColumn(
-                    "Filename",
-                    width="large",
-                ),
-                "Assets": st.column_config.NumberColumn(
-                    "Assets",
-                    help="Number of assets in this file",
-                ),
-                "Last Updated": st.column_config.TextColumn(
-                    "Last Updated",
-                    help="Last upload/update timestamp",
-                )
-            },
-            disabled=["Filename", "Assets", "Last Updated"],
-        )
+    # Runs as a fragment so ticking checkboxes only reruns this panel
+    @st.fragment
+    def file_management_panel():
+        st.markdown("---")
+        st.markdown("## 📂 File Management")
         
-        # Get selected files
-        selected_to_delete = edited_df[edited_df["Select"] == True]["Filename"].tolist()
+        source_files_data = get_source_files()
         
-        if selected_to_delete:
-            st.warning(f"⚠️ {len(selected_to_delete)} file(s) selected for deletion")
-            col1, col2 = st.columns([3, 1])
+        if source_files_data and len(source_files_data) > 0:
+            st.markdown("**Source Files**")
+            
+            # Create DataFrame for source files
+            files_df = pd.DataFrame([
+                {
+                    "Select": False,
+                    "Filename": sf['filename'],
+                    "Assets": sf['asset_count'],
+                    "Last Updated": sf.get('last_updated', 'N/A')[:19] if sf.get('last_updated') else 'N/A'
+                }
+                for sf in source_files_data
+            ])
+            
+            # Display editable dataframe with checkboxes
+            edited_df = st.data_editor(
+                files_df,
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "Select": st.column_config.CheckboxColumn(
+                        "Select",
+                        help="Select files to delete",
+                        default=False,
+                    ),
+                    "Filename": st.column_config.TextColumn(
+                        "Filename",
+                        width="large",
+                    ),
+                    "Assets": st.column_config.NumberColumn(
+                        "Assets",
+                        help="Number of assets in this file",
+                    ),
+                    "Last Updated": st.column_config.TextColumn(
+                        "Last Updated",
+                        help="Last upload/update timestamp",
+                    )
+                },
+                disabled=["Filename", "Assets", "Last Updated"],
+            )
             
-            with col2:
-                if st.button("🗑️ Delete Selected", type="secondary", use_container_width=True):
-                    success_count = 0
-                    failed_files = []
-                    
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
-                    
-                    for idx, filename in enumerate(selected_to_delete):
-                        status_text.text(f"Deleting {filename}...")
-                        result = delete_source_file(filename)
+            # Get selected files
+            selected_to_delete = edited_df[edited_df["Select"] == True]["Filename"].tolist()
+            
+            if selected_to_delete:
+                st.warning(f"⚠️ {len(selected_to_delete)} file(s) selected for deletion")
+                col1, col2 = st.columns([3, 1])
+                
+                with col2:
+                    if st.button("🗑️ Delete Selected", type="secondary", use_container_width=True):
+                        success_count = 0
+                        failed_files = []
                         
-                        if result and result.get('success'):
-                            success_count += 1
-                        else:
-                            failed_files.append(filename)
+                        progress_bar = st.progress(0)
+                        status_text = st.empty()
                         
-                        progress_bar.progress((idx + 1) / len(selected_to_delete))
-                    
-                    status_text.empty()
-                    progress_bar.empty()
-                    
-                    if success_count > 0:
-                        st.success(f"✓ Deleted {success_count} file(s)")
-                    
-                    if failed_files:
-                        st.error(f"✗ Failed to delete {len(failed_files)} file(s):")
-                        for fname in failed_files:
-                            st.text(f"  • {fname}")
-                    
-                    st.rerun()
-    else:
-        st.info("📁 No files uploaded yet")
+                        for idx, filename in enumerate(selected_to_delete):
+                            status_text.text(f"Deleting {filename}...")
+                            result = delete_source_file(filename)
+                            
+                            if result and result.get('success'):
+                                success_count += 1
+                            else:
+                                failed_files.append(filename)
+                            
+                            progress_bar.progress((idx + 1) / len(selected_to_delete))
+                        
+                        status_text.empty()
+                        progress_bar.empty()
+                        
+                        if success_count > 0:
+                            invalidate_data_caches()
+                            st.success(f"✓ Deleted {success_count} file(s)")
+                        
+                        if failed_files:
+                            st.error(f"✗ Failed to delete {len(failed_files)} file(s):")
+                            for fname in failed_files:
+                                st.text(f"  • {fname}")
+                        
+                        # Caches were already invalidated above; only this panel shows the change
+                        st.rerun(scope="fragment")
+        else:
+            st.info("📁 No files uploaded yet")
+    
+    file_management_panel()
 
 elif st.session_state.page == "Trace":
     # ==================== TRACE ASSETS PAGE ====================
@@ -1468,7 +2099,8 @@ elif st.session_state.page == "Trace":
             help="Filter assets by source file"
         )
         
-        selected_files = [file_options[display] for display in selected_display] if selected_display else None
+        # Sorted tuple so equivalent selections share one cache key
+        selected_files = tuple(sorted(file_options[display] for display in selected_display)) if selected_display else None
     
     st.markdown("---")
     
@@ -1591,6 +2223,7 @@ elif st.session_state.page == "Trace":
         with col2:
             if st.button("🗑️ Clear All", type="secondary", use_container_width=True, key="clear_all_btn"):
                 st.session_state.search_criteria = []
+                st.session_state.pop('last_search', None)
                 st.session_state.form_clear_counter += 1  # Increment to force form re-creation and clear input
                 st.session_state.show_analysis = False  # Reset analysis dialog
                 st.rerun()
@@ -1608,60 +2241,75 @@ elif st.session_state.page == "Trace":
     
     st.subheader("All Assets" if not selected_files else f"Assets from {len(selected_files)} file(s)")
     
+    # Without search criteria only the visible page is fetched; searches
+    # filter client-side and still need every asset
+    page_offset = None
+    if not st.session_state.search_criteria:
+        total_assets = sum(
+            sf['asset_count'] for sf in (source_files_data or [])
+            if not selected_files or sf['filename'] in selected_files
+        )
+        page_count = max(1, math.ceil(total_assets / ASSETS_PAGE_SIZE))
+        if st.session_state.get('assets_page', 1) > page_count:
+            st.session_state.assets_page = page_count
+        
+        col1, col2 = st.columns([1, 4])
+        with col1:
+            assets_page = st.number_input("Page", min_value=1, max_value=page_count, step=1, key="assets_page")
+        with col2:
+            st.markdown("<br>", unsafe_allow_html=True)  # Spacing
+            st.caption(f"{total_assets} assets · page {assets_page} of {page_count}")
+        page_offset = (assets_page - 1) * ASSETS_PAGE_SIZE
+    
     with st.spinner("Loading assets..."):
         # Get all assets or filtered by source files
-        data = get_assets_filtered(source_files=selected_files)
+        if page_offset is None:
+            data = get_assets_filtered(source_files=selected_files)
+        else:
+            data = get_assets_filtered(source_files=selected_files, limit=ASSETS_PAGE_SIZE, offset=page_offset)
         
         # Apply multiple search criteria filter with AND/OR logic
         if st.session_state.search_criteria and data and data.get('total', 0) > 0:
             all_assets = data['assets']
             
+            # Reuse the last result when only unrelated widgets triggered the rerun
+            search_key = (
+                tuple((c['term'], c['logic']) for c in st.session_state.search_criteria),
+                selected_files or (),
+                data['version']
+            )
+            last_search = st.session_state.get('last_search', {})
+            
             # Build result set based on logic chain
             result_set = set()
             current_set = set()
             
-            for idx, criterion in enumerate(st.session_state.search_criteria):
-                criterion_term = criterion['term'].lower()
-                criterion_logic = criterion['logic']
-                
-                # Find all assets matching this criterion
-                matching_assets = []
-                for asset_idx, asset in enumerate(all_assets):
-                    match_found = False
-                    
-                    # Check serial number
-                    if criterion_term in asset.get('serial_number', '').lower():
-                        match_found = True
-                    
-                    # Check error_type
-                    if not match_found and asset.get('error_type') and criterion_term in asset.get('error_type', '').lower():
-                        match_found = True
-                    
-                    # Check status
-                    if not match_found and asset.get('status') and criterion_term in asset.get('status', '').lower():
-                        match_found = True
-                    
-                    # Check all raw_data fields
-                    if not match_found:
-                        raw_data = asset.get('raw_data', {})
-                        for key, value in raw_data.items():
-                            if value and criterion_term in str(value).lower():
-                                match_found = True
-                                break
-                    
-                    if match_found:
-                        matching_assets.append(asset_idx)
-                
-                # Apply logic operation
-                if idx == 0:
-                    # First criterion - initialize result set
-                    result_set = set(matching_assets)
-                elif criterion_logic == "AND":
-                    # AND: intersection - only keep assets in both sets
-                    result_set = result_set.intersection(set(matching_assets))
-                elif criterion_logic == "OR":
-                    # OR: union - combine both sets
-                    result_set = result_set.union(set(matching_assets))
+            if last_search.get('key') == search_key:
+                result_set = last_search['indices']
+            else:
+                # Serial number, error type, status and all raw_data fields, one string per asset
+                haystack = build_search_haystack(data['version'], all_assets)
+                
+                for idx, criterion in enumerate(st.session_state.search_criteria):
+                    criterion_term = criterion['term'].lower()
+                    criterion_logic = criterion['logic']
+                    
+                    # Find all assets matching this criterion
+                    matches = haystack.str.contains(criterion_term, regex=False)
+                    matching_assets = matches.index[matches].tolist()
+                    
+                    # Apply logic operation
+                    if idx == 0:
+                        # First criterion - initialize result set
+                        result_set = set(matching_assets)
+                    elif criterion_logic == "AND":
+                        # AND: intersection - only keep assets in both sets
+                        result_set = result_set.intersection(set(matching_assets))
+                    elif criterion_logic == "OR":
+                        # OR: union - combine both sets
+                        result_set = result_set.union(set(matching_assets))
+                
+                st.session_state.last_search = {'key': search_key, 'indices': result_set}
             
             # Convert indices back to assets
             filtered_assets = [all_assets[idx] for idx in sorted(result_set)]
@@ -1669,7 +2317,8 @@ elif st.session_state.page == "Trace":
             # Update data with filtered results
             data = {
                 'total': len(filtered_assets),
-                'assets': filtered_assets
+                'assets': filtered_assets,
+                'version': data['version']
             }
             
             if len(filtered_assets) == 0:
@@ -1702,11 +2351,9 @@ elif st.session_state.page == "Trace":
                 
                 for asset in filtered_assets:
                     raw_data = asset.get('raw_data', {})
-                    customer_keywords = ['customer', 'client', 'end_customer', 'end customer', 
-                                       'customer_name', 'customer name', '客户', 'cust']
                     customer_found = False
                     for key, value in raw_data.items():
-                        if not key.startswith('_') and value and any(kw in key.lower() for kw in customer_keywords):
+                        if not key.startswith('_') and value and CUSTOMER_SUBSTR_RE.search(key.lower()):
                             customer_name = str(value).strip().upper()
                             if customer_name and customer_name not in ['N/A', 'NA', 'NONE', '']:
                                 customer_counts[customer_name] += 1
@@ -1717,97 +2364,23 @@ elif st.session_state.page == "Trace":
                 
                 if customer_counts:
                     sorted_customers = sorted(customer_counts.items(), key=lambda x: x[1], reverse=True)
-                    customers = [x[0] for x in sorted_customers]
-                    counts = [x[1] for x in sorted_customers]
-                    
-                    fig, ax = plt.subplots(figsize=(10, 6), facecolor='#1a1a2e')
-                    ax.set_facecolor('#16213e')
                     
-                    colors = ['#ff6b6b', '#51cf66', '#339af0', '#cc5de8', '#ffd43b', 
+                    colors = ['#ff6b6b', '#51cf66', '#339af0', '#cc5de8', '#ffd43b',
                              '#ff8787', '#ffa94d', '#74c0fc', '#b197fc', '#ffc9c9']
-                    
-                    bars = ax.barh(customers, counts, color=colors[:len(customers)], 
-                                  edgecolor='white', linewidth=0.5)
-                    ax.set_xlabel('Count', color='#ffffff', fontsize=12, fontweight='bold')
-                    ax.set_title('Assets by Customer', color='#ffffff', fontsize=14, fontweight='bold', pad=15)
-                    ax.invert_yaxis()
-                    ax.grid(axis='x', alpha=0.2, color='white', linestyle='--')
-                    ax.tick_params(colors='#ffffff', labelsize=10)
-                    
-                    for spine in ax.spines.values():
-                        spine.set_color('#3a4a5c')
-                    
-                    for i, bar in enumerate(bars):
-                        width = bar.get_width()
-                        ax.text(width + 0.5, bar.get_y() + bar.get_height()/2., 
-                               f'{int(width)}', ha='left', va='center', 
-                               fontsize=11, color='#ffffff', fontweight='bold')
-                    
-                    plt.tight_layout()
-                    st.pyplot(fig)
-                    plt.close()
+                    st.altair_chart(make_ranked_bar_chart(sorted_customers, 'Assets by Customer', colors), use_container_width=True, theme=None)
                 else:
                     st.info("No customer data available")
             
             # Tab 2: Timeline Analysis
             with tab2:
                 st.markdown("### Timeline Analysis")
-                date_months = []
-                
-                for asset in filtered_assets:
-                    key_cols = get_key_columns(asset)
-                    date_str = key_cols.get('Date', '')
-                    
-                    if date_str and date_str != 'N/A':
-                        try:
-                            if ' | ' in str(date_str):
-                                date_str = str(date_str).split(' | ')[0].strip()
-                            
-                            date_formats = ['%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%m/%d/%Y', 
-                                          '%d/%m/%Y', '%Y/%m/%d', '%Y_%m', '%Y-%m']
-                            
-                            for fmt in date_formats:
-                                try:
-                                    date_obj = datetime.strptime(str(date_str).strip(), fmt)
-                                    date_months.append(date_obj.strftime('%Y-%m'))
-                                    break
-                                except:
-                                    continue
-                        except:
-                            pass
+                dates = pd.Series([asset['_key_cols'].get('Date', '') for asset in filtered_assets], dtype=object)
+                month_counts = Counter(parse_months(dates).value_counts().to_dict())
                 
-                if date_months:
-                    month_counts = Counter(date_months)
+                if month_counts:
                     sorted_months = dict(sorted(month_counts.items()))
                     
-                    fig, ax = plt.subplots(figsize=(10, 6), facecolor='#1a1a2e')
-                    ax.set_facecolor('#16213e')
-                    
-                    months_list = list(sorted_months.keys())
-                    values_list = list(sorted_months.values())
-                    
-                    ax.plot(range(len(months_list)), values_list, color='#51cf66', linewidth=3, 
-                           marker='o', markersize=8, markerfacecolor='#51cf66', 
-                           markeredgecolor='white', markeredgewidth=2)
-                    ax.fill_between(range(len(months_list)), values_list, alpha=0.3, color='#51cf66')
-                    
-                    ax.set_xticks(range(len(months_list)))
-                    ax.set_xticklabels(months_list, rotation=45, ha='right', color='#ffffff', fontsize=10)
-                    ax.set_ylabel('Count', color='#ffffff', fontsize=12, fontweight='bold')
-                    ax.set_title('Asset Trend Over Time', color='#ffffff', fontsize=14, fontweight='bold', pad=15)
-                    ax.grid(axis='y', alpha=0.2, color='white', linestyle='--')
-                    ax.tick_params(colors='#ffffff', labelsize=10)
-                    
-                    for spine in ax.spines.values():
-                        spine.set_color('#3a4a5c')
-                    
-                    for i, value in enumerate(values_list):
-                        ax.text(i, value + max(values_list)*0.02, f'{int(value)}', 
-                               ha='center', va='bottom', fontsize=10, color='#ffffff', fontweight='bold')
-                    
-                    plt.tight_layout()
-                    st.pyplot(fig)
-                    plt.close()
+                    st.altair_chart(make_trend_chart(sorted_months.items(), 'Asset Trend Over Time'), use_container_width=True, theme=None)
                 else:
                     st.info("No date data available")
             
@@ -1817,45 +2390,17 @@ elif st.session_state.page == "Trace":
                 status_counts = Counter()
                 
                 for asset in filtered_assets:
-                    key_cols = get_key_columns(asset)
+                    key_cols = asset['_key_cols']
                     status = key_cols.get('Status', 'Unknown')
                     if status and status != 'N/A':
                         status_counts[status] += 1
                 
                 if status_counts:
                     sorted_status = sorted(status_counts.items(), key=lambda x: x[1], reverse=True)
-                    statuses = [x[0] for x in sorted_status]
-                    counts = [x[1] for x in sorted_status]
-                    
-                    fig, ax = plt.subplots(figsize=(10, 6), facecolor='#1a1a2e')
-                    ax.set_facecolor('#16213e')
                     
                     colors = ['#ffd43b', '#ffc107', '#ffb300', '#ffa000', '#ff8f00',
                              '#ff6f00', '#fb8c00', '#f57c00', '#ef6c00', '#e65100']
-                    
-                    bars = ax.bar(range(len(statuses)), counts, color=colors[:len(statuses)], 
-                                 edgecolor='white', linewidth=0.5, width=0.7)
-                    
-                    ax.set_xticks(range(len(statuses)))
-                    ax.set_xticklabels(statuses, rotation=45, ha='right', 
-                                      fontsize=10, fontweight='bold', color='#ffffff')
-                    ax.set_ylabel('Count', color='#ffffff', fontsize=12, fontweight='bold')
-                    ax.set_title('Assets by Status', color='#ffffff', fontsize=14, fontweight='bold', pad=15)
-                    ax.grid(axis='y', alpha=0.2, color='white', linestyle='--')
-                    ax.tick_params(colors='#ffffff', labelsize=10)
-                    
-                    for spine in ax.spines.values():
-                        spine.set_color('#3a4a5c')
-                    
-                    for i, bar in enumerate(bars):
-                        height = bar.get_height()
-                        ax.text(bar.get_x() + bar.get_width()/2, height,
-                               f'{int(height)}', ha='center', va='bottom', 
-                               fontsize=10, color='#ffffff', fontweight='bold')
-                    
-                    plt.tight_layout()
-                    st.pyplot(fig)
-                    plt.close()
+                    st.altair_chart(make_ranked_bar_chart(sorted_status, 'Assets by Status', colors, horizontal=False), use_container_width=True, theme=None)
                 else:
                     st.info("No status data available")
             
@@ -1865,7 +2410,7 @@ elif st.session_state.page == "Trace":
                 error_counts = Counter()
                 
                 for asset in filtered_assets:
-                    key_cols = get_key_columns(asset)
+                    key_cols = asset['_key_cols']
                     error_type = key_cols.get('Error', 'Unknown')
                     if error_type and error_type != 'N/A':
                         error_counts[error_type] += 1
@@ -1873,31 +2418,9 @@ elif st.session_state.page == "Trace":
                 if error_counts:
                     top_errors = dict(error_counts.most_common(10))
                     
-                    fig, ax = plt.subplots(figsize=(10, 6), facecolor='#1a1a2e')
-                    ax.set_facecolor('#16213e')
-                    
-                    colors = ['#ff6b6b', '#ee5a6f', '#f06595', '#cc5de8', '#845ef7', 
+                    colors = ['#ff6b6b', '#ee5a6f', '#f06595', '#cc5de8', '#845ef7',
                              '#5c7cfa', '#339af0', '#22b8cf', '#20c997', '#51cf66']
-                    
-                    bars = ax.barh(list(top_errors.keys()), list(top_errors.values()), 
-                                  color=colors[:len(top_errors)], edgecolor='white', linewidth=0.5)
-                    ax.set_xlabel('Count', color='#ffffff', fontsize=12, fontweight='bold')
-                    ax.set_title('Top 10 Error Types', color='#ffffff', fontsize=14, fontweight='bold', pad=15)
-                    ax.grid(axis='x', alpha=0.2, color='white', linestyle='--')
-                    ax.tick_params(colors='#ffffff', labelsize=10)
-                    
-                    for spine in ax.spines.values():
-                        spine.set_color('#3a4a5c')
-                    
-                    for bar in bars:
-                        width = bar.get_width()
-                        ax.text(width + 0.5, bar.get_y() + bar.get_height()/2, 
-                               f'{int(width)}', ha='left', va='center', 
-                               fontsize=11, color='#ffffff', fontweight='bold')
-                    
-                    plt.tight_layout()
-                    st.pyplot(fig)
-                    plt.close()
+                    st.altair_chart(make_ranked_bar_chart(top_errors.items(), 'Top 10 Error Types', colors), use_container_width=True, theme=None)
                 else:
                     st.info("No error data available")
             
@@ -1916,12 +2439,7 @@ elif st.session_state.page == "Trace":
             st.caption(f"Showing {len(assets)} assets - Click on any row to see full details")
             
             # Create table with only key columns
-            table_data = []
-            for idx, asset in enumerate(assets):
-                key_cols = get_key_columns(asset)
-                table_data.append(key_cols)
-            
-            df = pd.DataFrame(table_data)
+            df = pd.DataFrame([asset['_key_cols'] for asset in assets], dtype='string[pyarrow]')
             
             # Display table with row selection
             selected = st.dataframe(
@@ -1935,13 +2453,17 @@ elif st.session_state.page == "Trace":
             )
             
             # Show dialog when a row is selected
-            if selected.selection.rows:
+            if not selected.selection.rows:
+                st.session_state.pop('asset_table_dialog', None)
+            else:
                 selected_idx = selected.selection.rows[0]
                 selected_asset = assets[selected_idx]
                 
                 @st.dialog(f"Asset Details: {selected_asset['serial_number']}", width="large")
                 def show_asset_details():
                     raw_data = selected_asset.get('raw_data', {})
+                    # Lowercase each visible key once for the keyword scans below
+                    lowered = [(key, key.lower(), value) for key, value in raw_data.items() if not key.startswith('_')]
                     
                     st.info("ℹ️ Chinese text is automatically translated (may not be 100% accurate)")
                     
@@ -1961,19 +2483,17 @@ elif st.session_state.page == "Trace":
                         st.markdown("---")
                         st.markdown("**System Information**")
                         
-                        identity_keywords = ['system', 'cpu', 'sn', 'barcode', 'ppid', 'odm', 'location', '机房', 'vendor']
-                        for key, value in raw_data.items():
-                            if not key.startswith('_') and any(kw in key.lower() for kw in identity_keywords):
+                        for key, key_lower, value in lowered:
+                            if IDENTITY_KEY_RE.search(key_lower):
                                 translated_value = translate_text(value) if value else 'N/A'
                                 st.text(f"{key}: {translated_value}")
                     
                     # Tab 2: Timeline
                     with tab2:
-                        date_keywords = ['date', 'time', 'day', '日期', 'deploy', 'fail', 'rma', 'ship']
                         date_found = False
                         
-                        for key, value in raw_data.items():
-                            if not key.startswith('_') and any(kw in key.lower() for kw in date_keywords):
+                        for key, key_lower, value in lowered:
+                            if DATE_KEY_RE.search(key_lower):
                                 translated_value = translate_text(value) if value else 'N/A'
                                 st.metric(key, translated_value)
                                 date_found = True
@@ -1986,12 +2506,10 @@ elif st.session_state.page == "Trace":
                     
                     # Tab 3: Technical
                     with tab3:
-                        tech_keywords = ['error', 'fail', 'status', 'bios', 'firmware', 'log', 'symptom', 'issue', 
-                                       'test', 'code', 'version', '状态', '错误']
                         tech_found = False
                         
-                        for key, value in raw_data.items():
-                            if not key.startswith('_') and any(kw in key.lower() for kw in tech_keywords):
+                        for key, key_lower, value in lowered:
+                            if TECH_KEY_RE.search(key_lower):
                                 st.markdown(f"**{key}**")
                                 translated_value = translate_text(value) if value else 'N/A'
                                 st.text(str(translated_value))
@@ -2005,7 +2523,11 @@ elif st.session_state.page == "Trace":
                     with tab4:
                         st.json(raw_data)
                 
-                show_asset_details()
+                # Only open on a new selection, not on reruns from unrelated widgets
+                selected_id = selected_asset.get('id', selected_asset['serial_number'])
+                if st.session_state.get('asset_table_dialog') != selected_id:
+                    st.session_state['asset_table_dialog'] = selected_id
+                    show_asset_details()
         
         elif view_mode == "📄 Complete View":
             # Complete View: Show all columns from raw_data with visual indicators for normalized columns
@@ -2013,46 +2535,9 @@ elif st.session_state.page == "Trace":
             st.info("🔄 = Column normalized for analytics | Original values preserved")
             
             # Create a dynamic table with ALL columns from raw_data
-            assets_list = []
-            for a in assets:
-                # Start with basic info
-                asset_row = {
-                    'Serial Number': str(a['serial_number']),
-                    'Ingested': str(a['ingest_timestamp'][:10]) if a.get('ingest_timestamp') else 'N/A',
-                    'Source File': str(a.get('source_filename', 'N/A'))
-                }
-                
-                # Get metadata about normalized columns
-                raw_data = a.get('raw_data', {})
-                error_sources = raw_data.get('_error_sources', [])
-                column_classification = raw_data.get('_column_classification', {})
-                
-                # Add all columns from raw_data
-                if raw_data:
-                    for key, value in raw_data.items():
-                        # Skip metadata fields
-                        if key.startswith('_'):
-                            continue
-                        
-                        # Determine if this column was normalized
-                        display_key = key
-                        col_category = column_classification.get(key, "")
-                        
-                        # Add visual indicator for normalized columns
-                        if col_category in ["ERROR_TYPE", "STATUS"]:
-                            display_key = f"🔄 {key}"
-                        elif key in error_sources or any(key in str(src) for src in error_sources):
-                            display_key = f"🔄 {key}"
-                        
-                        # Convert all values to strings to avoid Arrow type errors
-                        asset_row[display_key] = str(value) if value is not None else 'N/A'
-                
-                assets_list.append(asset_row)
-            
-            # Create DataFrame and explicitly convert all columns to string type
-            assets_df = pd.DataFrame(assets_list)
-            for col in assets_df.columns:
-                assets_df[col] = assets_df[col].astype(str)
+            assets_df = build_complete_view_df(
+                data['version'], tuple(a.get('id') for a in assets), assets
+            )
             
             # Display table with row selection
             selected = st.dataframe(
@@ -2066,13 +2551,17 @@ elif st.session_state.page == "Trace":
             )
             
             # Show dialog when a row is selected
-            if selected.selection.rows:
+            if not selected.selection.rows:
+                st.session_state.pop('complete_asset_table_dialog', None)
+            else:
                 selected_idx = selected.selection.rows[0]
                 selected_asset = assets[selected_idx]
                 
                 @st.dialog(f"Asset Details: {selected_asset['serial_number']}", width="large")
                 def show_complete_asset_details():
                     raw_data = selected_asset.get('raw_data', {})
+                    # Lowercase each visible key once for the keyword scans below
+                    lowered = [(key, key.lower(), value) for key, value in raw_data.items() if not key.startswith('_')]
                     
                     st.info("ℹ️ Chinese text is automatically translated (may not be 100% accurate)")
                     
@@ -2092,19 +2581,17 @@ elif st.session_state.page == "Trace":
                         st.markdown("---")
                         st.markdown("**System Information**")
                         
-                        identity_keywords = ['system', 'cpu', 'sn', 'barcode', 'ppid', 'odm', 'location', '机房', 'vendor']
-                        for key, value in raw_data.items():
-                            if not key.startswith('_') and any(kw in key.lower() for kw in identity_keywords):
+                        for key, key_lower, value in lowered:
+                            if IDENTITY_KEY_RE.search(key_lower):
                                 translated_value = translate_text(value) if value else 'N/A'
                                 st.text(f"{key}: {translated_value}")
                     
                     # Tab 2: Timeline
                     with tab2:
-                        date_keywords = ['date', 'time', 'day', '日期', 'deploy', 'fail', 'rma', 'ship']
                         date_found = False
                         
-                        for key, value in raw_data.items():
-                            if not key.startswith('_') and any(kw in key.lower() for kw in date_keywords):
+                        for key, key_lower, value in lowered:
+                            if DATE_KEY_RE.search(key_lower):
                                 translated_value = translate_text(value) if value else 'N/A'
                                 st.metric(key, translated_value)
                                 date_found = True
@@ -2117,12 +2604,10 @@ elif st.session_state.page == "Trace":
                     
                     # Tab 3: Technical
                     with tab3:
-                        tech_keywords = ['error', 'fail', 'status', 'bios', 'firmware', 'log', 'symptom', 'issue', 
-                                       'test', 'code', 'version', '状态', '错误']
                         tech_found = False
                         
-                        for key, value in raw_data.items():
-                            if not key.startswith('_') and any(kw in key.lower() for kw in tech_keywords):
+                        for key, key_lower, value in lowered:
+                            if TECH_KEY_RE.search(key_lower):
                                 st.markdown(f"**{key}**")
                                 translated_value = translate_text(value) if value else 'N/A'
                                 st.text(str(translated_value))
@@ -2136,7 +2621,11 @@ elif st.session_state.page == "Trace":
                     with tab4:
                         st.json(raw_data)
                 
-                show_complete_asset_details()
+                # Only open on a new selection, not on reruns from unrelated widgets
+                selected_id = selected_asset.get('id', selected_asset['serial_number'])
+                if st.session_state.get('complete_asset_table_dialog') != selected_id:
+                    st.session_state['complete_asset_table_dialog'] = selected_id
+                    show_complete_asset_details()
     
     else:
         if selected_files:
@@ -2146,6 +2635,9 @@ elif st.session_state.page == "Trace":
 
 elif st.session_state.page == "Analytics":
     # ==================== ANALYTICS PAGE ====================
+    # Imported per chart page so Ingest/AI runs never load matplotlib
+    import matplotlib.pyplot as plt
+    
     st.markdown("## 📈 Analytics")
     st.markdown("Detailed breakdown and grouping of asset data")
     
@@ -2296,291 +2788,13 @@ elif st.session_state.page == "Analytics":
         if group_by == "Tier Analysis" and assets_with_tiers == 0:
             st.stop()
         
-        # Group assets by selected field
-        from collections import defaultdict
-        groups = defaultdict(list)
-        
-        for asset in assets:
-            key_cols = get_key_columns(asset)
-            raw_data = asset.get('raw_data', {})
-            
-            if group_by == "Failure Type":
-                group_key = key_cols.get('Error', 'Unknown')
-            elif group_by == "Month":
-                date_str = key_cols.get('Date', '')
-                if date_str and date_str != 'N/A':
-                    try:
-                        for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d']:
-                            try:
-                                date_obj = datetime.strptime(str(date_str).split()[0], fmt)
-                                group_key = date_obj.strftime('%Y-%m')
-                                break
-                            except:
-                                continue
-                        else:
-                            group_key = 'Unknown'
-                    except:
-                        group_key = 'Unknown'
-                else:
-                    group_key = 'Unknown'
-            elif group_by == "Status":
-                group_key = key_cols.get('Status', 'Unknown')
-            
-            elif group_by == "Month":
-                # Extract month from date
-                date_str = key_cols.get('Date', '')
-                if date_str and date_str != 'N/A':
-                    try:
-                        for fmt in ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d']:
-                            try:
-                                date_obj = datetime.strptime(str(date_str).split()[0], fmt)
-                                group_key = date_obj.strftime('%Y-%m')
-                                break
-                            except:
-                                continue
-                        else:
-                            group_key = 'Unknown'
-                    except:
-                        group_key = 'Unknown'
-                else:
-                    group_key = 'Unknown'
-            
-            elif group_by == "Customer":
-                # Intelligently extract customer from raw_data
-                customer_keywords = ['customer', 'client', 'end_customer', 'end customer', 
-                                   'customer_name', 'customer name', '客户', 'cust']
-                customer_found = False
-                for key, value in raw_data.items():
-                    if not key.startswith('_') and value and any(kw in key.lower() for kw in customer_keywords):
-                        customer_name = str(value).strip().upper()
-                        if customer_name and customer_name not in ['N/A', 'NA', 'NONE', '']:
-                            group_key = customer_name
-                            customer_found = True
-                            break
-                
-                if not customer_found:
-                    group_key = 'Unknown'
-            
-            elif group_by == "Tier Analysis":
-                # Detect tier columns and analyze test flow progression
-                # Look for tier-related columns: L1, L2, ATE, SLT, Tier0-5, etc.
-                tier_columns = []
-                tier_keywords = ['l1', 'l2', 'slt', 'ceslt', 'osv', 'afhc', 'tier0', 'tier1', 'tier2',
-                               'tier3', 'tier4', 'tier5', 'tier 0', 'tier 1', 'tier 2', 'tier 3', 'tier 4', 'tier 5',
-                               'ft1', 'ft2', 'fs1', 'fs2', 'diag', 'aft', 'wl:', 'hdrt', 'difect', 
-                               'per core', 'charz', 'shak', 'kvm']
-                
-                serial = key_cols.get('Serial Number', 'Unknown')
-                logger.info(f"\n--- Processing Asset: {serial} ---")
-                
-                for key in raw_data.keys():
-                    if not key.startswith('_'):
-                        key_lower = key.lower().strip()
-                        
-                        # Explicitly exclude date/time/mfg columns
-                        if any(x in key_lower for x in ['date', 'timestamp', 'time', 'mfg', 'wafer', 'ship', 'receive']):
-                            logger.debug(f"  Skipping date column: {key}")
-                            continue  # Skip all date/time/manufacturing date columns
-                        
-                        # Exclude status/result columns (not actual test tiers)
-                        if any(x in key_lower for x in ['status', 'result', 'plan', 'comment', 'debug', 'repro status']):
-                            logger.debug(f"  Skipping status column: {key}")
-                            continue
-                        
-                        # Check if this is a tier column using flexible matching
-                        is_tier = False
-                        for kw in tier_keywords:
-                            if kw in key_lower:
-                                is_tier = True
-                                logger.debug(f"  Tier column detected (keyword '{kw}'): {key}")
-                                break
-                        
-                        # Special handling for 'ate' - must be word boundary to avoid matching 'date'
-                        if not is_tier and ('ate' in key_lower or ' ate ' in key_lower or key_lower.startswith('ate ') or key_lower.endswith(' ate') or key_lower == 'ate'):
-                            # Make sure it's not part of 'date', 'update', 'create', etc.
-                            if 'date' not in key_lower and 'update' not in key_lower and 'create' not in key_lower:
-                                is_tier = True
-                                logger.debug(f"  Tier column detected (ATE match): {key}")
-                        
-                        if is_tier:
-                            tier_value = raw_data.get(key)
-                            tier_columns.append((key, tier_value))
-                            logger.info(f"  {key}: '{tier_value}'")
-                
-                logger.info(f"  Total tier columns found: {len(tier_columns)}")
-                
-                # Define pass/not-run values with smarter matching
-                def is_pass_value(val):
-                    """Check if a value indicates a passing test - ONLY explicit PASS/NFF/NFT without '?'"""
-                    if not val:
-                        return False
-                    val_str = str(val).strip().upper()
-                    
-                    # If value ends with "?", it's NOT a definitive pass (uncertain = failure)
-                    if val_str.endswith('?'):
-                        return False
-                    
-                    # Pass ONLY if it's exactly NFF/NFT (with optional hrs in parens) or PASS/PASSED
-                    # Must start with these exact prefixes
-                    if val_str.startswith('NFF') or val_str.startswith('NFT'):
-                        # Additional check: shouldn't contain failure keywords
-                        val_lower = val_str.lower()
-                        if any(fail_word in val_lower for fail_word in ['fail', 'hang', 'error', 'crash']):
-                            return False
-                        return True
-                    return val_str in ['PASS', 'PASSED']
-                
-                def is_not_run(val):
-                    """Check if a value indicates test was not run - ONLY explicit NOT RUN/N/A"""
-                    if not val or str(val).strip() == '':
-                        return True
-                    val_str = str(val).strip().upper()
-                    
-                    # Values with "?" are NOT "not run" - they are uncertain failures
-                    # Only explicit NOT RUN, N/A, NA count as not run
-                    return val_str in ['N/A', 'NA'] or 'NOT RUN' in val_str or 'NOTRUN' in val_str
-                
-                def is_failure(val):
-                    """Check if a value indicates a test failure - anything except explicit PASS or NOT RUN"""
-                    if is_not_run(val):
-                        return False
-                    if is_pass_value(val):
-                        return False
-                    # If it has content and it's not pass/not-run, it's a failure
-                    # This includes "Fail?", "NFF?", and any other uncertain or error values
-                    val_str = str(val).strip()
-                    return len(val_str) > 0
-                
-                # Sort tier columns by their tier level for proper progression analysis
-                # Tier order: tier0/l1/l2 -> tier1/ate ft -> tier2/slt -> tier3/fs1 -> tier4/diag -> tier5/fs2/wl
-                def get_tier_order(col_name):
-                    import re
-                    col_lower = col_name.lower()
-                    
-                    # Handle multi-part column names from merged headers: "Tier# - Group - Test"
-                    # Extract the tier number if present
-                    tier_match = re.search(r'tier\s*(\d+)', col_lower)
-                    if tier_match:
-                        tier_num = int(tier_match.group(1))
-                        return (tier_num, col_name)
-                    
-                    # Assign order priority - check for exact matches and substrings
-                    
-                    # Tier 0: Basic tests (L1, L2, ATE, SLT, CESLT, OSV, AFHC at Suzhou)
-                    # These are standalone simple names under Tier0-Suzhou header
-                    if (col_lower in ['l1', 'l2', 'ate', 'slt', 'ceslt', 'osv'] or 
-                        'afhc at suzhou' in col_lower or 'suzhou' in col_lower):
-                        return (0, col_name)
-                    
-                    # Tier 1: ATE detailed tests (ATE FT1, ATE FT2, Per Core Charz)
-                    elif any(x in col_lower for x in ['ate ft', 'ft1', 'ft2', 'per core', 'core char']):
-                        return (1, col_name)
-                    
-                    # Tier 2: SLT tests (SLT1, SLT2, SLT perCCD)
-                    elif any(x in col_lower for x in ['slt1', 'slt2', 'slt per', 'perccd']):
-                        return (2, col_name)
-                    
-                    # Tier 3: FS1 tests
-                    elif any(x in col_lower for x in ['fs1', 'l3 repro', 'afhc det', 'repro']):
-                        return (3, col_name)
-                    
-                    # Tier 4: Diag tests
-                    elif any(x in col_lower for x in ['diag', 'extended diag', 'shak', 'kvm']):
-                        return (4, col_name)
-                    
-                    # Tier 5: FS2 / WL tests
-                    elif any(x in col_lower for x in ['fs2', 'wl:', 'wl ', 'variable fan', 'freq exp', 'voltage exp', 'v + freq', 'nominal']):
-                        return (5, col_name)
-                    
-                    else:
-                        # Unknown tier
-                        return (99, col_name)
-                
-                # Sort tier columns by logical progression
-                tier_columns_sorted = sorted(tier_columns, key=lambda x: get_tier_order(x[0]))
-                
-                logger.info(f"  Analyzing tier results in progression order:")
-                
-                # Analyze test results across all tiers
-                has_any_failure = False
-                has_any_pass = False
-                has_any_not_run = False
-                all_not_run = True
-                
-                for tier_col, tier_value in tier_columns_sorted:
-                    tier_order = get_tier_order(tier_col)[0]
-                    
-                    is_fail = is_failure(tier_value)
-                    is_pass = is_pass_value(tier_value)
-                    is_not = is_not_run(tier_value)
-                    
-                    logger.info(f"    [Tier{tier_order}] {tier_col}: '{tier_value}' → is_fail={is_fail}, is_pass={is_pass}, is_not_run={is_not}")
-                    
-                    if is_fail:
-                        has_any_failure = True
-                        all_not_run = False
-                    elif is_pass:
-                        has_any_pass = True
-                        all_not_run = False
-                    elif is_not:
-                        has_any_not_run = True
-                
-                logger.info(f"  Summary: has_any_pass={has_any_pass}, has_any_failure={has_any_failure}, has_any_not_run={has_any_not_run}, all_not_run={all_not_run}")
-                
-                # Find the first failing tier in progression order
-                first_fail_tier = None
-                first_fail_value = None
-                first_fail_tier_num = None
-                if has_any_failure:
-                    for tier_col, tier_value in tier_columns_sorted:
-                        if is_failure(tier_value):
-                            first_fail_tier = tier_col
-                            first_fail_value = tier_value
-                            first_fail_tier_num = get_tier_order(tier_col)[0]
-                            logger.info(f"  First failure detected at: {tier_col} (value: '{tier_value}', tier_num: {first_fail_tier_num})")
-                            break
-                
-                # Determine grouping
-                logger.info(f"  Determining group assignment:")
-                if not tier_columns:
-                    group_key = "❓ No Tier Data"
-                    logger.info(f"  → Decision: No tier columns found")
-                    logger.info(f"  → Group: {group_key}")
-                elif all_not_run:
-                    group_key = "⏸️ Not Run - No Test Results"
-                    logger.info(f"  → Decision: All tests are 'Not run'")
-                    logger.info(f"  → Group: {group_key}")
-                elif first_fail_tier:
-                    # Extract clean tier name and append failure type
-                    tier_clean = extract_tier_name(first_fail_tier)
-                    # Shorten failure value for grouping (max 30 chars)
-                    fail_short = str(first_fail_value)[:30] if first_fail_value else 'Unknown'
-                    
-                    # If tier number is 99 (unknown tier), group as "No Tier Data" instead of "Tier99"
-                    if first_fail_tier_num == 99:
-                        group_key = f"❓ No Tier Data - {tier_clean}: {fail_short}"
-                    else:
-                        group_key = f"❌ Tier{first_fail_tier_num} {tier_clean}: {fail_short}"
-                    
-                    logger.info(f"  → Decision: Has failure at first failing tier")
-                    logger.info(f"  → Group: {group_key}")
-                elif has_any_pass and not has_any_failure and not has_any_not_run:
-                    # All Tiers Passed: ALL tiers must be explicitly PASS (no failures, no not-run)
-                    group_key = "✅ All Tiers Passed"
-                    logger.info(f"  → Decision: All tiers have explicit PASS results")
-                    logger.info(f"  → Group: {group_key}")
-                elif has_any_pass and not has_any_failure and has_any_not_run:
-                    # Has some passes and some not-run (no failures) - treat as Not Run
-                    group_key = "⏸️ Not Run - No Test Results"
-                    logger.info(f"  → Decision: Has passes but also has 'Not run' tiers")
-                    logger.info(f"  → Group: {group_key}")
-                else:
-                    group_key = "❓ No Tier Data"
-                    logger.info(f"  → Decision: Edge case - no clear pass/fail pattern")
-                    logger.info(f"  → Group: {group_key} (has_pass={has_any_pass}, has_fail={has_any_failure}, has_not_run={has_any_not_run})")
-            
-            if group_key:
-                groups[group_key].append(asset)
+        # Group assets by selected field: one group key per asset, then a pandas groupby
+        group_keys = GROUPERS[group_by](assets)
+        group_keys = group_keys[group_keys.notna() & group_keys.astype(bool)]
+        groups = {
+            group_key: [assets[pos] for pos in positions]
+            for group_key, positions in group_keys.groupby(group_keys, sort=False).groups.items()
+        }
         
         # Final summary logging for tier analysis
         if group_by == "Tier Analysis":
@@ -2606,10 +2820,10 @@ elif st.session_state.page == "Analytics":
                 table_data = []
                 display_assets = group_assets[:50]  # Show first 50
                 for idx, asset in enumerate(display_assets):
-                    key_cols = get_key_columns(asset)
+                    key_cols = asset['_key_cols']
                     table_data.append(key_cols)
                 
-                df = pd.DataFrame(table_data)
+                df = pd.DataFrame(table_data, dtype='string[pyarrow]')
                 
                 # Display table with row selection
                 selected = st.dataframe(
@@ -2636,6 +2850,8 @@ elif st.session_state.page == "Analytics":
                         @st.dialog(f"Asset Details: {selected_asset['serial_number']}", width="large")
                         def show_asset_details():
                             raw_data = selected_asset.get('raw_data', {})
+                            # Lowercase each visible key once for the keyword scans below
+                            lowered = [(key, key.lower(), value) for key, value in raw_data.items() if not key.startswith('_')]
                             
                             st.info("ℹ️ Chinese text is automatically translated (may not be 100% accurate)")
                             
@@ -2655,19 +2871,17 @@ elif st.session_state.page == "Analytics":
                                 st.markdown("---")
                                 st.markdown("**System Information**")
                                 
-                                identity_keywords = ['system', 'cpu', 'sn', 'barcode', 'ppid', 'odm', 'location', '机房', 'vendor']
-                                for key, value in raw_data.items():
-                                    if not key.startswith('_') and any(kw in key.lower() for kw in identity_keywords):
+                                for key, key_lower, value in lowered:
+                                    if IDENTITY_KEY_RE.search(key_lower):
                                         translated_value = translate_text(value) if value else 'N/A'
                                         st.text(f"{key}: {translated_value}")
                             
                             # Tab 2: Timeline
                             with tab2:
-                                date_keywords = ['date', 'time', 'day', '日期', 'deploy', 'fail', 'rma', 'ship']
                                 date_found = False
                                 
-                                for key, value in raw_data.items():
-                                    if not key.startswith('_') and any(kw in key.lower() for kw in date_keywords):
+                                for key, key_lower, value in lowered:
+                                    if DATE_KEY_RE.search(key_lower):
                                         translated_value = translate_text(value) if value else 'N/A'
                                         st.metric(key, translated_value)
                                         date_found = True
@@ -2680,12 +2894,10 @@ elif st.session_state.page == "Analytics":
                             
                             # Tab 3: Technical
                             with tab3:
-                                tech_keywords = ['error', 'fail', 'status', 'bios', 'firmware', 'log', 'symptom', 'issue', 
-                                               'test', 'code', 'version', '状态', '错误']
                                 tech_found = False
                                 
-                                for key, value in raw_data.items():
-                                    if not key.startswith('_') and any(kw in key.lower() for kw in tech_keywords):
+                                for key, key_lower, value in lowered:
+                                    if TECH_KEY_RE.search(key_lower):
                                         st.markdown(f"**{key}**")
                                         translated_value = translate_text(value) if value else 'N/A'
                                         st.text(str(translated_value))
@@ -2752,9 +2964,8 @@ elif st.session_state.page == "Analytics":
                                         row['Tracking #'] = str(tracking)
                                     
                                     # Add customer if available
-                                    customer_keywords = ['customer', 'client']
                                     for key, value in raw_data.items():
-                                        if not key.startswith('_') and value and any(kw in key.lower() for kw in customer_keywords):
+                                        if not key.startswith('_') and value and CUSTOMER_WORD_RE.search(key.lower()):
                                             row['Customer'] = str(value).strip().upper()[:10]
                                             break
                                     
@@ -2880,9 +3091,8 @@ elif st.session_state.page == "Analytics":
                                     
                                     # Get customer
                                     customer = 'Unknown'
-                                    customer_keywords = ['customer', 'client', 'end_customer', 'end customer', 'customer_name']
                                     for key, value in raw_data.items():
-                                        if not key.startswith('_') and value and any(kw in key.lower() for kw in customer_keywords):
+                                        if not key.startswith('_') and value and CUSTOMER_WORD_RE.search(key.lower()):
                                             customer = str(value).strip().upper()
                                             if customer in ['N/A', 'NA', 'NONE', '']:
                                                 customer = 'Unknown'
@@ -3012,32 +3222,7 @@ elif st.session_state.page == "Analytics":
                                                         break
                                 
                                 if owner_counts:
-                                    fig, ax = plt.subplots(figsize=(10, 6), facecolor='#1a1a2e')
-                                    ax.set_facecolor('#16213e')
-                                    
-                                    owners = list(owner_counts.keys())
-                                    counts = list(owner_counts.values())
-                                    colors = ['#ff6b6b', '#51cf66', '#339af0', '#ffd43b', '#cc5de8', '#ff8787', '#74c0fc']
-                                    
-                                    bars = ax.bar(owners, counts, color=colors[:len(owners)], edgecolor='white', linewidth=1)
-                                    ax.set_ylabel('Failure Count', color='#ffffff', fontsize=12, fontweight='bold')
-                                    ax.set_title('Failures by Owner/Status', color='#ffffff', fontsize=14, fontweight='bold', pad=15)
-                                    ax.grid(axis='y', alpha=0.2, color='white', linestyle='--')
-                                    ax.tick_params(colors='#ffffff')
-                                    
-                                    for spine in ax.spines.values():
-                                        spine.set_color('#3a4a5c')
-                                    
-                                    # Add value labels
-                                    for bar in bars:
-                                        height = bar.get_height()
-                                        ax.text(bar.get_x() + bar.get_width()/2., height,
-                                               f'{int(height)}', ha='center', va='bottom',
-                                               fontsize=11, color='#ffffff', fontweight='bold')
-                                    
-                                    plt.tight_layout()
-                                    st.pyplot(fig)
-                                    plt.close()
+                                    st.pyplot(make_owner_fig(tuple(owner_counts.items())))
                                 else:
                                     st.info("No owner/status information available")
                             
@@ -3053,9 +3238,8 @@ elif st.session_state.page == "Analytics":
                                     
                                     # Get platform
                                     platform = 'Unknown'
-                                    platform_keywords = ['platform', 'platf orm', 'model', 'type', 'sku', 'product']
                                     for key, value in raw_data.items():
-                                        if not key.startswith('_') and value and any(kw in key.lower() for kw in platform_keywords):
+                                        if not key.startswith('_') and value and PLATFORM_KEY_RE.search(key.lower()):
                                             platform = str(value).strip().upper()
                                             if platform in ['N/A', 'NA', 'NONE', '']:
                                                 platform = 'Unknown'
@@ -3074,36 +3258,11 @@ elif st.session_state.page == "Analytics":
                                                 platform_tier_fails[platform][tier_name] += 1
                                 
                                 if platform_tier_fails and any(platform_tier_fails.values()):
-                                    fig, ax = plt.subplots(figsize=(12, 6), facecolor='#1a1a2e')
-                                    ax.set_facecolor('#16213e')
-                                    
-                                    platforms = list(platform_tier_fails.keys())
                                     tier_names_short = list(set(tier for p in platform_tier_fails.values() for tier in p.keys()))[:10]
-                                    
-                                    x = range(len(tier_names_short))
-                                    width = 0.8 / len(platforms)
-                                    colors = ['#ff6b6b', '#51cf66', '#339af0', '#ffd43b', '#cc5de8', '#ff8787']
-                                    
-                                    for i, platform in enumerate(platforms[:6]):  # Max 6 platforms
-                                        counts = [platform_tier_fails[platform].get(t, 0) for t in tier_names_short]
-                                        offset = width * i - (width * len(platforms) / 2)
-                                        ax.bar([p + offset for p in x], counts, width, label=platform[:15], 
-                                              color=colors[i % len(colors)])
-                                    
-                                    ax.set_xticks(x)
-                                    ax.set_xticklabels(tier_names_short, rotation=45, ha='right', color='#ffffff', fontsize=9)
-                                    ax.set_ylabel('Failure Count', color='#ffffff', fontsize=12, fontweight='bold')
-                                    ax.set_title('Failures by Platform and Tier', color='#ffffff', fontsize=14, fontweight='bold', pad=15)
-                                    ax.legend(loc='upper right', facecolor='#16213e', edgecolor='white', labelcolor='white', fontsize=9)
-                                    ax.grid(axis='y', alpha=0.2, color='white', linestyle='--')
-                                    ax.tick_params(colors='#ffffff')
-                                    
-                                    for spine in ax.spines.values():
-                                        spine.set_color('#3a4a5c')
-                                    
-                                    plt.tight_layout()
-                                    st.pyplot(fig)
-                                    plt.close()
+                                    st.pyplot(make_platform_fig(
+                                        tuple((platform, tuple(counts.items())) for platform, counts in platform_tier_fails.items()),
+                                        tuple(tier_names_short)
+                                    ))
                                 else:
                                     st.info("No platform-tier correlation data available")
                             
@@ -3112,50 +3271,34 @@ elif st.session_state.page == "Analytics":
                                 st.markdown("### Tier Failure Trends Over Time")
                                 st.caption("Shows failure rate per tier over time - identify bottlenecks")
                                 
-                                # Extract date and tier failure info
-                                tier_date_fails = {}
+                                # Get each asset's date, then bucket them all by month in one pass
+                                asset_dates = []
                                 for asset in group_assets:
-                                    raw_data = asset.get('raw_data', {})
-                                    
-                                    # Get date
                                     date_str = None
-                                    date_keywords = ['date', 'time', 'mfg', 'deploy', 'rma', 'fail', 'ticket']
-                                    for key, value in raw_data.items():
-                                        if not key.startswith('_') and value and any(kw in key.lower() for kw in date_keywords):
+                                    for key, value in asset.get('raw_data', {}).items():
+                                        if not key.startswith('_') and value and TIER_DATE_KEY_RE.search(key.lower()):
                                             date_str = str(value).strip()
                                             break
+                                    asset_dates.append(date_str)
+                                asset_months = parse_months(pd.Series(asset_dates, dtype=object))
+                                
+                                # Extract tier failure info
+                                tier_date_fails = {}
+                                for asset, month in zip(group_assets, asset_months):
+                                    if pd.isna(month):
+                                        continue
+                                    raw_data = asset.get('raw_data', {})
                                     
-                                    if date_str and date_str not in ['N/A', 'NA', '']:
-                                        # Parse date to month
-                                        try:
-                                            if ' | ' in date_str:
-                                                date_str = date_str.split(' | ')[0].strip()
-                                            
-                                            date_formats = ['%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%m/%d/%Y', 
-                                                          '%d/%m/%Y', '%Y/%m/%d', '%Y_%m', '%Y-%m']
-                                            
-                                            month = None
-                                            for fmt in date_formats:
-                                                try:
-                                                    date_obj = datetime.strptime(date_str.strip(), fmt)
-                                                    month = date_obj.strftime('%Y-%m')
-                                                    break
-                                                except:
-                                                    continue
-                                            
-                                            if month:
-                                                # Check which tiers failed
-                                                for tier_col in all_tier_cols[:5]:  # Top 5 tiers
-                                                    value = raw_data.get(tier_col, '')
-                                                    if value:
-                                                        val_upper = str(value).strip().upper()
-                                                        if val_upper not in ['NFT', 'NFF', 'PASS', 'PASSED', 'N/A', 'NA', '']:
-                                                            tier_name = tier_col.replace(':', '').replace('_', ' ')[:15]
-                                                            if tier_name not in tier_date_fails:
-                                                                tier_date_fails[tier_name] = Counter()
-                                                            tier_date_fails[tier_name][month] += 1
-                                        except:
-                                            pass
+                                    # Check which tiers failed
+                                    for tier_col in all_tier_cols[:5]:  # Top 5 tiers
+                                        value = raw_data.get(tier_col, '')
+                                        if value:
+                                            val_upper = str(value).strip().upper()
+                                            if val_upper not in ['NFT', 'NFF', 'PASS', 'PASSED', 'N/A', 'NA', '']:
+                                                tier_name = tier_col.replace(':', '').replace('_', ' ')[:15]
+                                                if tier_name not in tier_date_fails:
+                                                    tier_date_fails[tier_name] = Counter()
+                                                tier_date_fails[tier_name][month] += 1
                                 
                                 if tier_date_fails:
                                     # Get all unique months
@@ -3219,11 +3362,9 @@ elif st.session_state.page == "Analytics":
                                 
                                 for asset in group_assets:
                                     raw_data = asset.get('raw_data', {})
-                                    customer_keywords = ['customer', 'client', 'end_customer', 'end customer', 
-                                                       'customer_name', 'customer name', '客户', 'cust']
                                     customer_found = False
                                     for key, value in raw_data.items():
-                                        if not key.startswith('_') and value and any(kw in key.lower() for kw in customer_keywords):
+                                        if not key.startswith('_') and value and CUSTOMER_SUBSTR_RE.search(key.lower()):
                                             customer_name = str(value).strip().upper()
                                             if customer_name and customer_name not in ['N/A', 'NA', 'NONE', '']:
                                                 customer_counts[customer_name] += 1
@@ -3234,97 +3375,23 @@ elif st.session_state.page == "Analytics":
                                 
                                 if customer_counts:
                                     sorted_customers = sorted(customer_counts.items(), key=lambda x: x[1], reverse=True)
-                                    customers = [x[0] for x in sorted_customers]
-                                    counts = [x[1] for x in sorted_customers]
-                                    
-                                    fig, ax = plt.subplots(figsize=(10, 6), facecolor='#1a1a2e')
-                                    ax.set_facecolor('#16213e')
                                     
-                                    colors = ['#ff6b6b', '#51cf66', '#339af0', '#cc5de8', '#ffd43b', 
+                                    colors = ['#ff6b6b', '#51cf66', '#339af0', '#cc5de8', '#ffd43b',
                                              '#ff8787', '#ffa94d', '#74c0fc', '#b197fc', '#ffc9c9']
-                                    
-                                    bars = ax.barh(customers, counts, color=colors[:len(customers)], 
-                                                  edgecolor='white', linewidth=0.5)
-                                    ax.set_xlabel('Count', color='#ffffff', fontsize=12, fontweight='bold')
-                                    ax.set_title('Assets by Customer', color='#ffffff', fontsize=14, fontweight='bold', pad=15)
-                                    ax.invert_yaxis()
-                                    ax.grid(axis='x', alpha=0.2, color='white', linestyle='--')
-                                    ax.tick_params(colors='#ffffff', labelsize=10)
-                                    
-                                    for spine in ax.spines.values():
-                                        spine.set_color('#3a4a5c')
-                                    
-                                    for i, bar in enumerate(bars):
-                                        width = bar.get_width()
-                                        ax.text(width + 0.5, bar.get_y() + bar.get_height()/2., 
-                                               f'{int(width)}', ha='left', va='center', 
-                                               fontsize=11, color='#ffffff', fontweight='bold')
-                                    
-                                    plt.tight_layout()
-                                    st.pyplot(fig)
-                                    plt.close()
+                                    st.altair_chart(make_ranked_bar_chart(sorted_customers, 'Assets by Customer', colors), use_container_width=True, theme=None)
                                 else:
                                     st.info("No customer data available")
                             
                             # Tab 2: Timeline Analysis
                             with tab2:
                                 st.markdown("### Timeline Analysis")
-                                date_months = []
-                                
-                                for asset in group_assets:
-                                    key_cols = get_key_columns(asset)
-                                    date_str = key_cols.get('Date', '')
-                                    
-                                    if date_str and date_str != 'N/A':
-                                        try:
-                                            if ' | ' in str(date_str):
-                                                date_str = str(date_str).split(' | ')[0].strip()
-                                            
-                                            date_formats = ['%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%m/%d/%Y', 
-                                                          '%d/%m/%Y', '%Y/%m/%d', '%Y_%m', '%Y-%m']
-                                            
-                                            for fmt in date_formats:
-                                                try:
-                                                    date_obj = datetime.strptime(str(date_str).strip(), fmt)
-                                                    date_months.append(date_obj.strftime('%Y-%m'))
-                                                    break
-                                                except:
-                                                    continue
-                                        except:
-                                            pass
+                                dates = pd.Series([asset['_key_cols'].get('Date', '') for asset in group_assets], dtype=object)
+                                month_counts = Counter(parse_months(dates).value_counts().to_dict())
                                 
-                                if date_months:
-                                    month_counts = Counter(date_months)
+                                if month_counts:
                                     sorted_months = dict(sorted(month_counts.items()))
                                     
-                                    fig, ax = plt.subplots(figsize=(10, 6), facecolor='#1a1a2e')
-                                    ax.set_facecolor('#16213e')
-                                    
-                                    months_list = list(sorted_months.keys())
-                                    values_list = list(sorted_months.values())
-                                    
-                                    ax.plot(range(len(months_list)), values_list, color='#51cf66', linewidth=3, 
-                                           marker='o', markersize=8, markerfacecolor='#51cf66', 
-                                           markeredgecolor='white', markeredgewidth=2)
-                                    ax.fill_between(range(len(months_list)), values_list, alpha=0.3, color='#51cf66')
-                                    
-                                    ax.set_xticks(range(len(months_list)))
-                                    ax.set_xticklabels(months_list, rotation=45, ha='right', color='#ffffff', fontsize=10)
-                                    ax.set_ylabel('Count', color='#ffffff', fontsize=12, fontweight='bold')
-                                    ax.set_title('Asset Trend Over Time', color='#ffffff', fontsize=14, fontweight='bold', pad=15)
-                                    ax.grid(axis='y', alpha=0.2, color='white', linestyle='--')
-                                    ax.tick_params(colors='#ffffff', labelsize=10)
-                                    
-                                    for spine in ax.spines.values():
-                                        spine.set_color('#3a4a5c')
-                                    
-                                    for i, value in enumerate(values_list):
-                                        ax.text(i, value + max(values_list)*0.02, f'{int(value)}', 
-                                               ha='center', va='bottom', fontsize=10, color='#ffffff', fontweight='bold')
-                                    
-                                    plt.tight_layout()
-                                    st.pyplot(fig)
-                                    plt.close()
+                                    st.altair_chart(make_trend_chart(sorted_months.items(), 'Asset Trend Over Time'), use_container_width=True, theme=None)
                                 else:
                                     st.info("No date data available")
                             
@@ -3334,45 +3401,17 @@ elif st.session_state.page == "Analytics":
                                 status_counts = Counter()
                                 
                                 for asset in group_assets:
-                                    key_cols = get_key_columns(asset)
+                                    key_cols = asset['_key_cols']
                                     status = key_cols.get('Status', 'Unknown')
                                     if status and status != 'N/A':
                                         status_counts[status] += 1
                                 
                                 if status_counts:
                                     sorted_status = sorted(status_counts.items(), key=lambda x: x[1], reverse=True)
-                                    statuses = [x[0] for x in sorted_status]
-                                    counts = [x[1] for x in sorted_status]
-                                    
-                                    fig, ax = plt.subplots(figsize=(10, 6), facecolor='#1a1a2e')
-                                    ax.set_facecolor('#16213e')
                                     
                                     colors = ['#ffd43b', '#ffc107', '#ffb300', '#ffa000', '#ff8f00',
                                              '#ff6f00', '#fb8c00', '#f57c00', '#ef6c00', '#e65100']
-                                    
-                                    bars = ax.bar(range(len(statuses)), counts, color=colors[:len(statuses)], 
-                                                 edgecolor='white', linewidth=0.5, width=0.7)
-                                    
-                                    ax.set_xticks(range(len(statuses)))
-                                    ax.set_xticklabels(statuses, rotation=45, ha='right', 
-                                                      fontsize=10, fontweight='bold', color='#ffffff')
-                                    ax.set_ylabel('Count', color='#ffffff', fontsize=12, fontweight='bold')
-                                    ax.set_title('Assets by Status', color='#ffffff', fontsize=14, fontweight='bold', pad=15)
-                                    ax.grid(axis='y', alpha=0.2, color='white', linestyle='--')
-                                    ax.tick_params(colors='#ffffff', labelsize=10)
-                                    
-                                    for spine in ax.spines.values():
-                                        spine.set_color('#3a4a5c')
-                                    
-                                    for i, bar in enumerate(bars):
-                                        height = bar.get_height()
-                                        ax.text(bar.get_x() + bar.get_width()/2, height,
-                                               f'{int(height)}', ha='center', va='bottom', 
-                                               fontsize=10, color='#ffffff', fontweight='bold')
-                                    
-                                    plt.tight_layout()
-                                    st.pyplot(fig)
-                                    plt.close()
+                                    st.altair_chart(make_ranked_bar_chart(sorted_status, 'Assets by Status', colors, horizontal=False), use_container_width=True, theme=None)
                                 else:
                                     st.info("No status data available")
                             
@@ -3382,7 +3421,7 @@ elif st.session_state.page == "Analytics":
                                 error_counts = Counter()
                                 
                                 for asset in group_assets:
-                                    key_cols = get_key_columns(asset)
+                                    key_cols = asset['_key_cols']
                                     error_type = key_cols.get('Error', 'Unknown')
                                     if error_type and error_type != 'N/A':
                                         error_counts[error_type] += 1
@@ -3390,31 +3429,9 @@ elif st.session_state.page == "Analytics":
                                 if error_counts:
                                     top_errors = dict(error_counts.most_common(10))
                                     
-                                    fig, ax = plt.subplots(figsize=(10, 6), facecolor='#1a1a2e')
-                                    ax.set_facecolor('#16213e')
-                                    
-                                    colors = ['#ff6b6b', '#ee5a6f', '#f06595', '#cc5de8', '#845ef7', 
+                                    colors = ['#ff6b6b', '#ee5a6f', '#f06595', '#cc5de8', '#845ef7',
                                              '#5c7cfa', '#339af0', '#22b8cf', '#20c997', '#51cf66']
-                                    
-                                    bars = ax.barh(list(top_errors.keys()), list(top_errors.values()), 
-                                                  color=colors[:len(top_errors)], edgecolor='white', linewidth=0.5)
-                                    ax.set_xlabel('Count', color='#ffffff', fontsize=12, fontweight='bold')
-                                    ax.set_title('Top 10 Error Types', color='#ffffff', fontsize=14, fontweight='bold', pad=15)
-                                    ax.grid(axis='x', alpha=0.2, color='white', linestyle='--')
-                                    ax.tick_params(colors='#ffffff', labelsize=10)
-                                    
-                                    for spine in ax.spines.values():
-                                        spine.set_color('#3a4a5c')
-                                    
-                                    for bar in bars:
-                                        width = bar.get_width()
-                                        ax.text(width + 0.5, bar.get_y() + bar.get_height()/2, 
-                                               f'{int(width)}', ha='left', va='center', 
-                                               fontsize=11, color='#ffffff', fontweight='bold')
-                                    
-                                    plt.tight_layout()
-                                    st.pyplot(fig)
-                                    plt.close()
+                                    st.altair_chart(make_ranked_bar_chart(top_errors.items(), 'Top 10 Error Types', colors), use_container_width=True, theme=None)
                                 else:
                                     st.info("No error data available")
                             
@@ -3586,7 +3603,7 @@ elif st.session_state.page == "AI":
                                 "content": msg["content"]
                             })
                         
-                        response = requests.post(
+                        response = SESSION.post(
                             f"{BACKEND_URL}/ai/chat",
                             json={
                                 "message": user_input,
@@ -3598,7 +3615,7 @@ elif st.session_state.page == "AI":
                         )
                         
                         if response.status_code == 200:
-                            result = response.json()
+                            result = orjson.loads(response.content)
                             
                             # Add AI response
                             st.session_state.chat_messages.append({
@@ -3612,7 +3629,7 @@ elif st.session_state.page == "AI":
                             
                             st.rerun()
                         else:
-                            st.error(f"Error: {response.json().get('detail', 'Unknown error')}")
+                            st.error(f"Error: {_error_detail(response)}")
                             
                     except Exception as e:
                         st.error(f"Failed to get AI response: {str(e)}")
@@ -3644,7 +3661,7 @@ elif st.session_state.page == "AI":
             if analyze_button:
                 with st.spinner("🤖 AI is analyzing your data... This may take a minute..."):
                     try:
-                        response = requests.post(
+                        response = SESSION.post(
                             f"{BACKEND_URL}/ai/analyze",
                             json={
                                 "file_ids": source_files,
@@ -3654,10 +3671,10 @@ elif st.session_state.page == "AI":
                         )
                         
                         if response.status_code == 200:
-                            result = response.json()
+                            result = orjson.loads(response.content)
                             st.session_state.analysis_cache = result
                         else:
-                            st.error(f"Error: {response.json().get('detail', 'Unknown error')}")
+                            st.error(f"Error: {_error_detail(response)}")
                             
                     except Exception as e:
                         st.error(f"Analysis failed: {str(e)}")
@@ -3782,7 +3799,7 @@ elif st.session_state.page == "AI":
             if viz_button and viz_request:
                 with st.spinner("🤖 AI is generating your visualization..."):
                     try:
-                        response = requests.post(
+                        response = SESSION.post(
                             f"{BACKEND_URL}/ai/visualize",
                             json={
                                 "request": viz_request,
@@ -3792,7 +3809,7 @@ elif st.session_state.page == "AI":
                         )
                         
                         if response.status_code == 200:
-                            result = response.json()
+                            result = orjson.loads(response.content)
                             
                             if result["success"]:
                                 st.session_state.current_viz = result
@@ -3803,7 +3820,7 @@ elif st.session_state.page == "AI":
                                     with st.expander("View Generated Code (with error)"):
                                         st.code(result["code"], language="python")
                         else:
-                            st.error(f"Error: {response.json().get('detail', 'Unknown error')}")
+                            st.error(f"Error: {_error_detail(response)}")
                             
                     except Exception as e:
                         st.error(f"Visualization failed: {str(e)}")
@@ -3827,8 +3844,10 @@ elif st.session_state.page == "AI":
                     col1, col2, col3 = st.columns(3)
                     
                     with col1:
-                        # HTML export
-                        html_str = fig.to_html()
+                        # HTML export (rendered once per visualization, not on every rerun)
+                        html_str = viz.get("html")
+                        if html_str is None:
+                            html_str = viz["html"] = fig.to_html()
                         st.download_button(
                             label="💾 Download as HTML",
                             data=html_str,
@@ -3886,7 +3905,7 @@ elif st.session_state.page == "AI":
             if investigate_button and final_topic:
                 with st.spinner("🔬 AI Agent is investigating... This may take a few minutes..."):
                     try:
-                        response = requests.post(
+                        response = SESSION.post(
                             f"{BACKEND_URL}/ai/investigate",
                             json={
                                 "topic": final_topic,
@@ -3897,11 +3916,11 @@ elif st.session_state.page == "AI":
                         )
                         
                         if response.status_code == 200:
-                            result = response.json()
+                            result = orjson.loads(response.content)
                             st.session_state.investigation = result
                             st.success("✅ Investigation Complete!")
                         else:
-                            st.error(f"Error: {response.json().get('detail', 'Unknown error')}")
+                            st.error(f"Error: {_error_detail(response)}")
                             
                     except Exception as e:
                         st.error(f"Investigation failed: {str(e)}")
@@ -3967,9 +3986,4 @@ elif st.session_state.page == "AI":
 
 # Footer
 st.markdown("---")
-st.markdown(
-    "<div style='text-align: center; color: #666;'>"
-    "Silicon Trace v3.0 | Built with FastAPI & Streamlit"
-    "</div>",
-    unsafe_allow_html=True
-)
+st.markdown(FOOTER_HTML, unsafe_allow_html=True)